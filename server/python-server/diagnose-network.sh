@@ -95,6 +95,8 @@ if [ -n "$WIFI_IP" ]; then
         echo "❌ $WIFI_IP:8888 不可访问"
     fi
 fi
+echo "   📡 可达性之外的延迟分析 (mDNS/连接/状态/滚动ACK):"
+echo "   python3 latency_probe.py --host ${WIFI_IP:-127.0.0.1}"
 echo ""
 
 # 6. iOS应用诊断提示
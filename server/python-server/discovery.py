@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Service discovery: Bonjour/mDNS advertisement and Supabase IP registration.
+
+`zeroconf` and `requests` are optional and imported only when registering,
+so the listener comes up without paying for either.
+"""
+import socket
+
+SERVICE_TYPE = "_watchscroller._tcp.local."
+SERVICE_NAME = "WatchScroller." + SERVICE_TYPE
+
+
+class ServiceAdvertiser:
+    def __init__(self, port, log, uuid="zaynjarvis",
+                 supabase_url="https://qeioxayacjcrbxbuqzef.functions.supabase.co"):
+        self.port = port
+        self.log = log
+        self.uuid = uuid
+        self.supabase_url = supabase_url
+        self.zeroconf = None
+        self.service_info = None
+
+    def register_bonjour_service(self):
+        """Register Bonjour/mDNS service for auto-discovery"""
+        try:
+            from zeroconf import ServiceInfo, Zeroconf
+        except ImportError:
+            self.log("⚠️  Zeroconf not available, skipping Bonjour registration (pip install zeroconf)")
+            return
+
+        try:
+            # Get all available IP addresses
+            local_ips = self.get_all_local_ips()
+            hostname = socket.gethostname()
+
+            self.log(f"📍 Available IPs: {local_ips}")
+
+            # Create service info with all available IP addresses
+            addresses = [socket.inet_aton(ip) for ip in local_ips if ip != "127.0.0.1"]
+
+            if not addresses:
+                self.log("❌ No valid IP addresses found for Bonjour")
+                return
+
+            self.service_info = ServiceInfo(
+                SERVICE_TYPE,
+                SERVICE_NAME,
+                addresses=addresses,
+                port=self.port,
+                properties={
+                    'version': '1.0',
+                    'platform': 'mac',
+                    'hostname': hostname,
+                    'primary_ip': local_ips[0] if local_ips else 'unknown'
+                }
+            )
+
+            # Register service on all interfaces
+            self.zeroconf = Zeroconf()
+            self.zeroconf.register_service(self.service_info)
+            self.log(f"📡 Bonjour service registered: {SERVICE_NAME}")
+            self.log(f"📍 Broadcasting on IPs: {local_ips} port {self.port}")
+            self.log(f"📍 Interfaces: {[name for idx, name in socket.if_nameindex()]}")
+
+        except Exception as e:
+            self.log(f"❌ Failed to register Bonjour service: {e}")
+            import traceback
+            self.log(f"Stack trace: {traceback.format_exc()}")
+
+    def register_ip_with_supabase(self):
+        """Register IP address with Supabase for fallback service discovery"""
+        try:
+            import requests
+        except ImportError:
+            self.log("⚠️  Requests not available, skipping Supabase IP registration (pip install requests)")
+            return
+
+        try:
+            # Get the primary local IP address
+            primary_ip = self.get_local_ip()
+            if not primary_ip or primary_ip == "127.0.0.1":
+                self.log("❌ No valid IP address found for Supabase registration")
+                return
+
+            # Prepare registration data
+            registration_data = {
+                "uuid": self.uuid,
+                "ip": primary_ip
+            }
+
+            # Make POST request to register IP
+            url = f"{self.supabase_url}/set-ip"
+            headers = {"Content-Type": "application/json"}
+
+            self.log(f"🌐 Registering IP with Supabase: {primary_ip}")
+            response = requests.post(url, json=registration_data, headers=headers, timeout=10)
+
+            if response.status_code == 200:
+                self.log(f"✅ Successfully registered IP {primary_ip} with Supabase")
+            else:
+                self.log(f"❌ Failed to register IP with Supabase: HTTP {response.status_code}")
+                self.log(f"Response: {response.text}")
+
+        except requests.exceptions.RequestException as e:
+            self.log(f"❌ Network error registering IP with Supabase: {e}")
+        except Exception as e:
+            self.log(f"❌ Failed to register IP with Supabase: {e}")
+            import traceback
+            self.log(f"Stack trace: {traceback.format_exc()}")
+
+    def unregister_bonjour_service(self):
+        """Unregister Bonjour/mDNS service"""
+        if self.zeroconf and self.service_info:
+            try:
+                self.zeroconf.unregister_service(self.service_info)
+                self.log("📡 Bonjour service unregistered")
+            except Exception as e:
+                self.log(f"❌ Failed to unregister Bonjour service: {e}")
+        if self.zeroconf:
+            try:
+                self.zeroconf.close()  # Releases its sockets and background threads
+            except Exception as e:
+                self.log(f"❌ Failed to close Zeroconf: {e}")
+        self.zeroconf = None
+        self.service_info = None
+
+    def get_local_ip(self):
+        """Get local IP address more reliably"""
+        try:
+            # Method 1: Connect to external server to get local IP
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            local_ip = s.getsockname()[0]
+            s.close()
+            return local_ip
+        except:
+            try:
+                # Method 2: Try hostname resolution
+                hostname = socket.gethostname()
+                return socket.gethostbyname(hostname)
+            except:
+                # Method 3: Fallback to localhost
+                return "127.0.0.1"
+
+    def get_all_local_ips(self):
+        """Get all local IP addresses for Bonjour registration"""
+        import subprocess
+        ips = []
+
+        try:
+            # Use ifconfig to get all IPs
+            result = subprocess.run(['ifconfig'], capture_output=True, text=True)
+            for line in result.stdout.split('\n'):
+                if 'inet ' in line and '127.0.0.1' not in line:
+                    # Extract IP address
+                    parts = line.strip().split()
+                    for i, part in enumerate(parts):
+                        if part == 'inet' and i + 1 < len(parts):
+                            ip = parts[i + 1]
+                            if self.is_valid_ip(ip) and ip not in ips:
+                                ips.append(ip)
+        except:
+            self.log("⚠️ Could not get interface IPs, using primary IP")
+
+        # Get primary IP as fallback
+        primary_ip = self.get_local_ip()
+        if primary_ip and primary_ip != "127.0.0.1" and primary_ip not in ips:
+            ips.insert(0, primary_ip)  # Put primary IP first
+
+        # Ensure we have at least one IP
+        if not ips:
+            ips.append("127.0.0.1")
+
+        return ips
+
+    def is_valid_ip(self, ip):
+        """Check if IP address is valid"""
+        try:
+            parts = ip.split('.')
+            return len(parts) == 4 and all(0 <= int(part) <= 255 for part in parts)
+        except:
+            return False
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Scroll injection in a dedicated child process.
+
+Client threads push scroll amounts into single-producer/single-consumer ring
+buffers in shared memory, one thread at a time per ring under the
+RingInjector's lock; a child process drains them, coalesces everything
+pending into one injection per axis and records receipt-to-injection latency
+back into shared memory. A pipe byte wakes the child only when it is idle, and
+a watchdog thread in the parent restarts the child if it dies.
+
+The rings rely on each index having exactly one writer and on aligned 8-byte
+stores not tearing; every slot also carries its sequence number so a consumer
+that sees the head move before the slot contents simply retries later.
+"""
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from metrics import HISTOGRAM_BUCKETS, LatencyHistogram, bucket_index
+
+# Header layout (producer and consumer fields on separate cache lines)
+HEAD_OFFSET = 0          # u64 written by the producer: next sequence to publish
+SLEEPING_OFFSET = 8      # u64 written by the consumer: 1 while blocked on the wake pipe
+TAIL_OFFSET = 64         # u64 written by the consumer: next sequence to consume
+INJECTED_OFFSET = 72     # u64 consumer: deltas applied
+CALLS_OFFSET = 80        # u64 consumer: backend calls made after coalescing
+HISTOGRAM_OFFSET = 128   # u64[HISTOGRAM_BUCKETS] consumer: receipt-to-injection latency
+SLOTS_OFFSET = HISTOGRAM_OFFSET + 8 * HISTOGRAM_BUCKETS
+
+U64 = struct.Struct('<Q')
+# seq (u64), received monotonic ns (q), vertical, horizontal (i32)
+SLOT = struct.Struct('<Qqii')
+HISTOGRAM = struct.Struct(f'<{HISTOGRAM_BUCKETS}Q')
+
+
+class ShmRing:
+    """SPSC ring of scroll deltas in multiprocessing.shared_memory"""
+    def __init__(self, capacity=1024, name=None):
+        from multiprocessing import shared_memory  # Only the process/worker modes need it
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=SLOTS_OFFSET + capacity * SLOT.size)
+            self.shm.buf[:SLOTS_OFFSET] = bytes(SLOTS_OFFSET)
+            self.owner = True
+        else:
+            # Attaching must not hand the segment to this process's resource tracker (3.13+)
+            extra = {'track': False} if sys.version_info >= (3, 13) else {}
+            self.shm = shared_memory.SharedMemory(name=name, **extra)
+            self.owner = False
+        self.buf = self.shm.buf
+        self.capacity = (self.shm.size - SLOTS_OFFSET) // SLOT.size
+        self.name = self.shm.name
+
+    def _get(self, offset):
+        return U64.unpack_from(self.buf, offset)[0]
+
+    def _set(self, offset, value):
+        U64.pack_into(self.buf, offset, value)
+
+    def push(self, vertical, horizontal, received_ns):
+        """Producer side; False when the ring is full"""
+        head = self._get(HEAD_OFFSET)
+        if head - self._get(TAIL_OFFSET) >= self.capacity:
+            return False
+        SLOT.pack_into(self.buf, SLOTS_OFFSET + (head % self.capacity) * SLOT.size,
+                       head + 1, received_ns, vertical, horizontal)
+        self._set(HEAD_OFFSET, head + 1)
+        return True
+
+    def consumer_sleeping(self):
+        return self._get(SLEEPING_OFFSET) == 1
+
+    def pop_all(self):
+        """Consumer side; returns the published (received_ns, vertical, horizontal) entries"""
+        tail = self._get(TAIL_OFFSET)
+        head = self._get(HEAD_OFFSET)
+        entries = []
+        while tail < head:
+            seq, received_ns, vertical, horizontal = SLOT.unpack_from(
+                self.buf, SLOTS_OFFSET + (tail % self.capacity) * SLOT.size)
+            if seq != tail + 1:
+                break  # Slot not fully visible yet
+            entries.append((received_ns, vertical, horizontal))
+            tail += 1
+        self._set(TAIL_OFFSET, tail)
+        return entries
+
+    def depth(self):
+        tail = self._get(TAIL_OFFSET)  # Before head: the tail never passes a head read after it
+        return self._get(HEAD_OFFSET) - tail
+
+    def latency_histogram(self):
+        return LatencyHistogram(HISTOGRAM.unpack_from(self.buf, HISTOGRAM_OFFSET))
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def injector_main(ring_names, wake_reader, backend_name):
+    """Child process entry point: drain rings, coalesce, inject, account"""
+    from scroll_backends import create_backend
+    backend = create_backend(backend_name)
+    backend.warm_up()  # Pay for heavy backend imports before the first scroll arrives
+    rings = [ShmRing(name=name) for name in ring_names]
+    histogram = [list(ring.latency_histogram().counts) for ring in rings]
+    wake_fd = wake_reader.fileno()
+    parent_pid = os.getppid()
+
+    while True:
+        pending = False
+        for index, ring in enumerate(rings):
+            entries = ring.pop_all()
+            if not entries:
+                continue
+            pending = True
+            vertical = sum(entry[1] for entry in entries)
+            horizontal = sum(entry[2] for entry in entries)
+            calls = 0
+            if vertical or horizontal:
+                backend.scroll_vector(vertical, horizontal)
+                calls = 1
+            now = time.monotonic_ns()
+            counts = histogram[index]
+            for received_ns, _, _ in entries:
+                us = (now - received_ns) // 1000
+                counts[bucket_index(us)] += 1
+            HISTOGRAM.pack_into(ring.buf, HISTOGRAM_OFFSET, *counts)
+            U64.pack_into(ring.buf, INJECTED_OFFSET, U64.unpack_from(ring.buf, INJECTED_OFFSET)[0] + len(entries))
+            U64.pack_into(ring.buf, CALLS_OFFSET, U64.unpack_from(ring.buf, CALLS_OFFSET)[0] + calls)
+        if pending:
+            continue
+
+        # Announce we are about to sleep, then re-check to close the race with a producer
+        for ring in rings:
+            U64.pack_into(ring.buf, SLEEPING_OFFSET, 1)
+        if not any(ring.depth() for ring in rings):
+            readable, _, _ = select.select([wake_fd], [], [], 0.1)
+            if readable:
+                os.read(wake_fd, 4096)
+        for ring in rings:
+            U64.pack_into(ring.buf, SLEEPING_OFFSET, 0)
+        if os.getppid() != parent_pid:
+            return  # Orphaned: the server went away without stopping us
+
+
+class InlineInjector:
+    """Injects on the calling client thread (the default)"""
+    mode = "inline"
+    dropped = 0  # Never drops; matches RingInjector's counter
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.resolution = backend.resolution
+        self.histogram = LatencyHistogram()
+
+    def submit(self, vertical, horizontal, received_ns=None):
+        self.backend.scroll_vector(vertical, horizontal)
+        if received_ns is not None:
+            self.histogram.record_ns(time.monotonic_ns() - received_ns)
+
+    def warm_up(self):
+        self.backend.warm_up()
+
+    def queue_depth(self):
+        return 0
+
+    def latency_histogram(self):
+        return self.histogram
+
+    def stop(self):
+        pass
+
+
+class RingInjector:
+    """Producer end of a ring; scroll output is injected by an InjectorSupervisor's child"""
+    mode = "process"
+
+    def __init__(self, ring, wake_writer, resolution=1):
+        self.ring = ring
+        self.resolution = resolution  # Output units per wheel line of the child's backend
+        self.wake_writer = wake_writer
+        os.set_blocking(self.wake_writer.fileno(), False)
+        self.lock = threading.Lock()  # Client threads share the ring, which takes one producer at a time
+        self.submitted = 0
+        self.dropped = 0
+
+    def submit(self, vertical, horizontal, received_ns=None):
+        if received_ns is None:
+            received_ns = time.monotonic_ns()
+        with self.lock:
+            self.submitted += 1
+            if not self.ring.push(vertical, horizontal, received_ns):
+                self.dropped += 1
+                return
+        if self.ring.consumer_sleeping():
+            try:
+                os.write(self.wake_writer.fileno(), b'\x01')
+            except (BlockingIOError, BrokenPipeError):
+                pass  # Already has a wake byte pending, or the child is restarting
+
+    def queue_depth(self):
+        return self.ring.depth()
+
+    def latency_histogram(self):
+        return self.ring.latency_histogram()
+
+    def stop(self):
+        self.ring.close()
+
+
+class InjectorSupervisor:
+    """Runs injector_main in a child process and restarts it whenever it exits"""
+    def __init__(self, ring_names, wake_reader, backend_name, log, restart_delay=0.5):
+        self.ring_names = ring_names
+        self.wake_reader = wake_reader
+        self.backend_name = backend_name
+        self.log = log
+        self.restart_delay = restart_delay
+        self.restarts = 0
+        self.running = True
+        self.process = None
+        self._spawn()
+        self.watchdog = threading.Thread(target=self._supervise, daemon=True)
+        self.watchdog.start()
+
+    def _spawn(self):
+        import multiprocessing
+        self.process = multiprocessing.Process(
+            target=injector_main, args=(self.ring_names, self.wake_reader, self.backend_name),
+            name="scroll-injector", daemon=True)
+        self.process.start()
+        self.log(f"💉 Injector process started (pid {self.process.pid}, backend {self.backend_name})")
+
+    def _supervise(self):
+        while self.running:
+            self.process.join()
+            if not self.running:
+                break
+            self.restarts += 1
+            self.log(f"💥 Injector process exited with code {self.process.exitcode}, restarting")
+            time.sleep(self.restart_delay)
+            if self.running:
+                self._spawn()
+
+    def stop(self):
+        self.running = False
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout=1)
+
+
+class ProcessInjector(RingInjector):
+    """Hands scroll output to a supervised child process through shared memory"""
+    def __init__(self, backend_name, log, resolution=1, capacity=1024, restart_delay=0.5):
+        import multiprocessing
+        wake_reader, wake_writer = multiprocessing.Pipe(duplex=False)
+        super().__init__(ShmRing(capacity), wake_writer, resolution)
+        self.supervisor = InjectorSupervisor([self.ring.name], wake_reader, backend_name, log, restart_delay)
+
+    def stop(self):
+        self.supervisor.stop()
+        self.ring.close()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""WatchScroller latency probe.
+
+Splits "scrolling feels slow" into its parts: how long Bonjour takes to
+resolve the server, how long a TCP connect takes, the status round trip, and
+ack round-trip percentiles and jitter for a synthetic scroll stream. Scroll
+frames are sent with the probe flag ("x":1), so the server runs its full
+parse/physics/ack path on a private session without moving the pointer.
+
+    python3 latency_probe.py                      # discover via Bonjour
+    python3 latency_probe.py --host 192.168.1.20  # skip discovery
+    python3 latency_probe.py --json probe.json    # also write machine-readable results
+"""
+import argparse
+import json
+import socket
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime
+
+SERVICE_TYPE = "_watchscroller._tcp.local."
+
+
+def percentiles(samples_ms):
+    if not samples_ms:
+        return {}
+    ordered = sorted(samples_ms)
+
+    def pick(fraction):
+        return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+    # RFC 3550-style jitter: mean absolute difference between consecutive samples
+    diffs = [abs(b - a) for a, b in zip(samples_ms, samples_ms[1:])]
+    return {
+        "count": len(ordered),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": pick(0.50),
+        "p90_ms": pick(0.90),
+        "p99_ms": pick(0.99),
+        "max_ms": round(ordered[-1], 3),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "jitter_ms": round(statistics.fmean(diffs), 3) if diffs else 0.0,
+    }
+
+
+def probe_mdns(timeout):
+    """Time Bonjour browse + resolve of the first WatchScroller service"""
+    try:
+        from zeroconf import ServiceBrowser, Zeroconf
+    except ImportError:
+        return {"error": "zeroconf not installed (pip install zeroconf)"}
+
+    found = threading.Event()
+    result = {}
+    start = time.perf_counter()
+    zeroconf = Zeroconf()
+
+    class Listener:
+        def add_service(self, zc, service_type, name):
+            browsed = time.perf_counter()
+            info = zc.get_service_info(service_type, name, timeout=int(timeout * 1000))
+            if info is None or found.is_set():
+                return
+            result.update({
+                "name": name,
+                "browse_ms": round((browsed - start) * 1000, 3),
+                "resolve_ms": round((time.perf_counter() - start) * 1000, 3),
+                "addresses": [socket.inet_ntoa(address) for address in info.addresses if len(address) == 4],
+                "port": info.port,
+            })
+            found.set()
+
+        def update_service(self, zc, service_type, name):
+            pass
+
+        def remove_service(self, zc, service_type, name):
+            pass
+
+    browser = ServiceBrowser(zeroconf, SERVICE_TYPE, Listener())
+    try:
+        if not found.wait(timeout):
+            result["error"] = f"no {SERVICE_TYPE} service within {timeout:.1f}s"
+    finally:
+        browser.cancel()
+        zeroconf.close()
+    return result
+
+
+def probe_connect(host, port, attempts, timeout):
+    samples = []
+    errors = 0
+    for _ in range(attempts):
+        start = time.perf_counter()
+        try:
+            socket.create_connection((host, port), timeout=timeout).close()
+            samples.append((time.perf_counter() - start) * 1000)
+        except OSError:
+            errors += 1
+        time.sleep(0.02)
+    return dict(percentiles(samples), errors=errors)
+
+
+def read_json_reply(sock, buffer):
+    """Read one JSON object; replies may or may not be newline-terminated"""
+    decoder = json.JSONDecoder()
+    while True:
+        text = buffer.lstrip()
+        if text:
+            try:
+                obj, end = decoder.raw_decode(text)
+                return obj, text[end:]
+            except json.JSONDecodeError:
+                pass
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        buffer += chunk.decode('utf-8')
+
+
+def probe_status(host, port, attempts, timeout):
+    samples = []
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = ""
+        for _ in range(attempts):
+            start = time.perf_counter()
+            sock.sendall(b'{"a":2}\n')
+            _, buffer = read_json_reply(sock, buffer)
+            samples.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+    return percentiles(samples)
+
+
+def probe_scroll_stream(host, port, frames, interval, timeout):
+    """Ack RTT for probe-flagged scroll frames sent at the bridge's cadence"""
+    samples = []
+    lost = 0
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buffer = ""
+        next_send = time.perf_counter()
+        for i in range(frames):
+            pixels = 950 if (i // 20) % 2 == 0 else -950
+            start = time.perf_counter()
+            sock.sendall(b'{"a":1,"p":%d,"x":1}\n' % pixels)
+            try:
+                _, buffer = read_json_reply(sock, buffer)
+                samples.append((time.perf_counter() - start) * 1000)
+            except socket.timeout:
+                lost += 1
+            next_send += interval
+            delay = next_send - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    return dict(percentiles(samples), lost=lost, interval_ms=interval * 1000)
+
+
+def format_stats(stats):
+    if "error" in stats:
+        return f"❌ {stats['error']}"
+    if not stats.get("count"):
+        return "❌ no samples"
+    return (f"p50 {stats['p50_ms']:.2f}  p90 {stats['p90_ms']:.2f}  p99 {stats['p99_ms']:.2f}  "
+            f"max {stats['max_ms']:.2f}  jitter {stats['jitter_ms']:.2f} ms  (n={stats['count']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure where WatchScroller latency comes from")
+    parser.add_argument('--host', help='server address (default: discover via Bonjour, then 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--mdns-timeout', type=float, default=5.0)
+    parser.add_argument('--skip-mdns', action='store_true')
+    parser.add_argument('--connects', type=int, default=20, help='TCP connect attempts')
+    parser.add_argument('--status', type=int, default=20, help='status round trips')
+    parser.add_argument('--frames', type=int, default=300, help='synthetic scroll frames')
+    parser.add_argument('--interval', type=float, default=0.016, help='seconds between scroll frames')
+    parser.add_argument('--timeout', type=float, default=2.0)
+    parser.add_argument('--json', metavar='PATH', help="write results as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = {"timestamp": datetime.now().isoformat(timespec='seconds'), "port": args.port}
+
+    if not args.skip_mdns:
+        report["mdns"] = probe_mdns(args.mdns_timeout)
+    host = args.host
+    if host is None:
+        addresses = report.get("mdns", {}).get("addresses") or ["127.0.0.1"]
+        host = addresses[0]
+        if report.get("mdns", {}).get("port"):
+            args.port = report["mdns"]["port"]
+    report["host"] = host
+
+    try:
+        report["connect"] = probe_connect(host, args.port, args.connects, args.timeout)
+        report["status_rtt"] = probe_status(host, args.port, args.status, args.timeout)
+        report["scroll_ack_rtt"] = probe_scroll_stream(host, args.port, args.frames, args.interval, args.timeout)
+    except (OSError, ConnectionError) as e:
+        report["error"] = str(e)
+
+    if args.json != '-':
+        print(f"📡 WatchScroller latency probe → {host}:{args.port}")
+        if "mdns" in report:
+            mdns = report["mdns"]
+            if "error" in mdns:
+                print(f"   mDNS resolve   ❌ {mdns['error']}")
+            else:
+                print(f"   mDNS resolve   browse {mdns['browse_ms']:.1f} ms, resolved {mdns['resolve_ms']:.1f} ms")
+        for key, label in (("connect", "TCP connect"), ("status_rtt", "status RTT"),
+                           ("scroll_ack_rtt", "scroll ack RTT")):
+            if key in report:
+                print(f"   {label:<14} {format_stats(report[key])}")
+        if "error" in report:
+            print(f"   ❌ {report['error']}")
+    if args.json:
+        text = json.dumps(report, indent=2)
+        if args.json == '-':
+            print(text)
+        else:
+            with open(args.json, 'w') as f:
+                f.write(text + '\n')
+            print(f"💾 Results written to {args.json}")
+    sys.exit(1 if "error" in report else 0)
+
+
+if __name__ == '__main__':
+    main()
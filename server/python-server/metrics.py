@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Lightweight latency accounting shared by the server and its helpers."""
+
+# Log-linear buckets: exact below 4µs, then four sub-buckets per power of two
+# (~19% resolution) up to 2^31µs
+HISTOGRAM_BUCKETS = 128
+
+
+def bucket_index(us):
+    if us < 4:
+        return max(us, 0)
+    shift = us.bit_length() - 3
+    return min(4 * shift + (us >> shift), HISTOGRAM_BUCKETS - 1)
+
+
+def bucket_upper_us(index):
+    if index < 4:
+        return index
+    shift = index // 4 - 1
+    return (((index % 4) + 5) << shift) - 1
+
+
+class LatencyHistogram:
+    """Fixed-size latency histogram in microseconds; cheap enough for every frame"""
+    def __init__(self, counts=None):
+        self.counts = list(counts) if counts is not None else [0] * HISTOGRAM_BUCKETS
+        self.count = sum(self.counts)
+
+    def record_ns(self, ns):
+        self.counts[bucket_index(ns // 1000)] += 1
+        self.count += 1
+
+    def merge(self, other):
+        for i, value in enumerate(other.counts):
+            self.counts[i] += value
+        self.count += other.count
+
+    def percentile_us(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for index, value in enumerate(self.counts):
+            seen += value
+            if value and seen >= target:
+                return bucket_upper_us(index)
+        return bucket_upper_us(HISTOGRAM_BUCKETS - 1)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "p50_us": self.percentile_us(0.50),
+            "p90_us": self.percentile_us(0.90),
+            "p99_us": self.percentile_us(0.99),
+            "p999_us": self.percentile_us(0.999),
+            "max_us": self.percentile_us(1.0),
+        }
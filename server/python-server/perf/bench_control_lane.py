@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Ping round trip behind scroll bursts, with and without the control lane.
+
+Starts the server in this interpreter with the null backend and a client
+process that writes a burst of scroll frames followed by a ping in a single
+send. It times how long the pong takes to arrive, then drains the burst's
+acks before the next one. Without the lane the pong waits behind every
+frame in the burst. With the lane it is answered first, even when the burst
+spans many reads. Also reports the server's own control_latency histogram
+(receipt to reply) for each mode. If a pong or an ack does not arrive within
+--timeout, the run stops and the bench fails instead of waiting forever.
+
+    python3 perf/bench_control_lane.py --burst 400 --iterations 500
+    python3 perf/bench_control_lane.py --burst 40      # fits in one read (1024 bytes)
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def burst_client(port, burst, iterations, timeout, results):
+    """Pong times in µs, and whether a burst went unanswered (lost frames or pong)"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.settimeout(timeout)
+    payload = b'{"a":1,"p":950,"x":1}\n' * burst + b'{"a":3}\n'
+    samples = []
+    stalled = False
+    try:
+        for _ in range(iterations):
+            start = time.perf_counter_ns()
+            sock.sendall(payload)
+            buffer = b''
+            ponged = False
+            while not ponged or buffer.count(b'"ok"') < burst:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    raise ConnectionError("server closed the connection")
+                buffer += chunk
+                if not ponged and b'pong' in buffer:
+                    samples.append((time.perf_counter_ns() - start) / 1000)
+                    ponged = True
+    except socket.timeout:
+        stalled = True
+    sock.close()
+    results.put((samples, stalled))
+
+
+def run_mode(control_lane, burst, iterations, timeout):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+        server = tcp_server.WatchScrollerServer(host='127.0.0.1', port=0, backend=tcp_server.NullBackend(),
+                                                advertise=False, frame_rate_limit=None,
+                                                displacement_rate_limit=None, control_lane=control_lane,
+                                                control_rate_limit=None)
+    server.log = lambda message: None
+    threading.Thread(target=server.start, daemon=True).start()
+    server.ready.wait()
+
+    results = multiprocessing.Queue()
+    client = multiprocessing.Process(target=burst_client, args=(server.port, burst, iterations, timeout, results))
+    client.start()
+    samples, stalled = results.get()
+    client.join()
+    summary = server.control_latency.summary()
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        server.stop()
+    return sorted(samples), summary, stalled
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--burst', type=int, default=400,
+                        help='scroll frames written ahead of each ping (22 bytes each)')
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--timeout', type=float, default=5.0, help='seconds to wait for a pong or an ack')
+    args = parser.parse_args()
+
+    print(f"burst {args.burst} frames ({args.burst * 22 + 8} bytes)")
+    print(f"{'lane':<5} {'pings':>6} {'rtt p50µs':>10} {'rtt p99µs':>10} {'server p50µs':>13} {'server p99µs':>13}")
+    failed = False
+    for control_lane in (False, True):
+        samples, summary, stalled = run_mode(control_lane, args.burst, args.iterations, args.timeout)
+        if not samples:
+            print(f"{'on' if control_lane else 'off':<5} {0:>6}")
+            failed = True
+            continue
+
+        def pick(fraction):
+            return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+        print(f"{'on' if control_lane else 'off':<5} {len(samples):>6} {pick(0.5):>10.0f} {pick(0.99):>10.0f} "
+              f"{summary['p50_us']:>13} {summary['p99_us']:>13}")
+        if stalled:
+            print(f"❌ lane {'on' if control_lane else 'off'}: no pong or missing acks after {args.timeout:g}s "
+                  f"(frames lost?)")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
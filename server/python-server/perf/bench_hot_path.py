@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Microbenchmarks for the parse -> physics -> inject hot path.
+
+Each case is timed over several repeats and reported as ns/op (median) with its
+median absolute deviation, plus peak bytes allocated per op (tracemalloc).
+Results are compared against a stored baseline in perf/baselines/ and the run
+fails when a case is slower beyond both a relative tolerance and the measured
+noise band. The baseline's own noise widens that band by at most the
+tolerance, so a noisy baseline cannot wave large slowdowns through. A slowdown
+beyond the tolerance that only this run's noise explains is reported as
+"noisy" rather than ok.
+
+    python3 perf/bench_hot_path.py                  # compare against baseline
+    python3 perf/bench_hot_path.py --save-baseline  # record a new baseline
+    python3 perf/bench_hot_path.py --save-baseline --passes 5 --repeats 51 --target 0.02
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+# Bump when cases change meaning so stale baselines are not compared against
+BASELINE_VERSION = 1
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+# Warn when saving a baseline whose MAD is above this fraction of a case's time
+MAX_BASELINE_MAD = 0.05
+ADDRESS = ('127.0.0.1', 50000)
+
+
+class NullSocket:
+    """Stands in for a client socket; swallows acks and responses"""
+    def send(self, data):
+        return len(data)
+
+    sendall = send
+
+
+def build_cases():
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+    server = tcp_server.WatchScrollerServer(backend=tcp_server.NullBackend(), frame_rate_limit=None, displacement_rate_limit=None)
+    server.log = lambda message: None
+    sock = NullSocket()
+    session = server.open_session(sock)
+
+    single = '{"a":1,"p":950}\n'
+    batched = ''.join('{"a":1,"p":%d}\n' % (900 + i) for i in range(16))
+    concatenated = ''.join('{"a":1,"p":%d}' % (900 + i) for i in range(16)) + '\n'
+    unbalanced = '{' * 2048 + '"a":1'
+    nested = '{"a":' * 64 + '1' + '}' * 64 + '{"a":1,"p":950}'
+    tricky = '{"a":"}}{{"}' * 32
+    scroll_message = {"a": 1, "p": 950}
+    diagonal_message = {"a": 1, "p": 950, "h": 600}
+    status_message = {"a": 9}  # Unknown action: pure dispatch cost
+
+    pixels = [950, 1200, 2500, 700]
+    state = {'i': 0}
+
+    def physics():
+        state['i'] += 1
+        server.perform_mac_scroll(pixels[state['i'] & 3], "vertical", session)
+
+    return {
+        'parse_single': lambda: server.parse_and_handle_messages(single, sock, ADDRESS),
+        'parse_newline_batch16': lambda: server.parse_and_handle_messages(batched, sock, ADDRESS),
+        'parse_concatenated16': lambda: server.parse_and_handle_messages(concatenated, sock, ADDRESS),
+        'concat_unbalanced_2k': lambda: server.parse_concatenated_json(unbalanced, sock, ADDRESS),
+        'concat_nested_64': lambda: server.parse_concatenated_json(nested, sock, ADDRESS),
+        'concat_braces_in_strings': lambda: server.parse_concatenated_json(tricky, sock, ADDRESS),
+        'handle_message_scroll': lambda: server.handle_message(scroll_message, sock, ADDRESS),
+        'handle_message_scroll_2axis': lambda: server.handle_message(diagonal_message, sock, ADDRESS),
+        'handle_message_unknown': lambda: server.handle_message(status_message, sock, ADDRESS),
+        'perform_mac_scroll_null': physics,
+        'ack_encode_send': lambda: server.send_scroll_ack(sock, ADDRESS),
+    }
+
+
+def calibrate(fn, target_seconds):
+    """Pick an iteration count so one repeat takes roughly target_seconds"""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target_seconds / 10 or iterations >= 1 << 22:
+            return max(1, int(iterations * target_seconds / max(elapsed, 1e-9)))
+        iterations *= 4
+
+
+def measure_time(fn, repeats, target_seconds):
+    iterations = calibrate(fn, target_seconds)
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeats):
+            start = time.perf_counter_ns()
+            for _ in range(iterations):
+                fn()
+            samples.append((time.perf_counter_ns() - start) / iterations)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    median = statistics.median(samples)
+    mad = statistics.median(abs(s - median) for s in samples)
+    return median, mad
+
+
+def measure_alloc(fn, ops=200):
+    """Average peak bytes traced by tracemalloc for a single op"""
+    fn()  # Warm caches so one-time allocations are not charged to the op
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(ops):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn()
+            total += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    return total / ops
+
+
+def baseline_path():
+    tag = f"{platform.python_implementation().lower()}{sys.version_info.major}{sys.version_info.minor}"
+    return os.path.join(BASELINE_DIR, f"hot_path-{tag}.json")
+
+
+def compare(results, baseline, rel_tolerance, noise_factor):
+    """Return the names of cases that regressed against the baseline"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline['cases'].get(name)
+        if base is None:
+            result['verdict'] = 'new'
+            continue
+        slower = result['ns_per_op'] - base['ns_per_op']
+        allowed = base['ns_per_op'] * rel_tolerance
+        noise = max(noise_factor * result['mad_ns'], min(noise_factor * base['mad_ns'], allowed))
+        time_regressed = slower > allowed and slower > noise
+        alloc_regressed = result['alloc_bytes_per_op'] > base['alloc_bytes_per_op'] * (1 + rel_tolerance) + 64
+        if time_regressed or alloc_regressed:
+            result['verdict'] = 'REGRESSED'
+            regressions.append(name)
+        elif slower > allowed:
+            result['verdict'] = 'noisy'  # Slower beyond the tolerance, but within this run's noise
+        elif -slower > allowed and -slower > noise:
+            result['verdict'] = 'faster'
+        else:
+            result['verdict'] = 'ok'
+        result['baseline_ns_per_op'] = base['ns_per_op']
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=15, help='timed repeats per case')
+    parser.add_argument('--target', type=float, default=0.05, help='seconds per repeat')
+    parser.add_argument('--passes', type=int, default=1,
+                        help='measure every case this many times, keeping its pass with the smallest MAD')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slowdown allowed before flagging a regression')
+    parser.add_argument('--noise-factor', type=float, default=3.0,
+                        help='slowdown must also exceed this many MADs')
+    parser.add_argument('--filter', default='', help='only run cases containing this substring')
+    parser.add_argument('--save-baseline', action='store_true', help='store results as the new baseline')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    cases = {name: fn for name, fn in build_cases().items() if args.filter in name}
+    # Whole passes one after another, so a noisy stretch on a busy machine spoils one pass
+    # of several cases rather than every pass of one
+    passes = {name: [] for name in cases}
+    for _ in range(args.passes):
+        for name, fn in cases.items():
+            passes[name].append(measure_time(fn, args.repeats, args.target))
+    results = {}
+    for name, fn in cases.items():
+        ns_per_op, mad = min(passes[name], key=lambda measured: measured[1] / measured[0])
+        results[name] = {
+            'ns_per_op': round(ns_per_op, 1),
+            'mad_ns': round(mad, 1),
+            'alloc_bytes_per_op': round(measure_alloc(fn), 1),
+        }
+
+    path = baseline_path()
+    regressions = []
+    if args.save_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                'version': BASELINE_VERSION,
+                'python': platform.python_version(),
+                'machine': f"{platform.system()} {platform.machine()}",
+                'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'cases': results,
+            }, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"💾 Baseline saved to {path}")
+        noisy = [name for name, r in results.items() if r['mad_ns'] > r['ns_per_op'] * MAX_BASELINE_MAD]
+        if noisy:
+            print(f"⚠️  MAD above {MAX_BASELINE_MAD:.0%} for {', '.join(noisy)}; re-record on a quieter "
+                  f"machine or with more --repeats / a longer --target")
+    elif os.path.exists(path):
+        with open(path) as f:
+            baseline = json.load(f)
+        if baseline.get('version') != BASELINE_VERSION:
+            print(f"⚠️  Baseline {path} is version {baseline.get('version')}, "
+                  f"suite is version {BASELINE_VERSION}; re-record with --save-baseline")
+        else:
+            regressions = compare(results, baseline, args.tolerance, args.noise_factor)
+    else:
+        print(f"ℹ️  No baseline at {path}; record one with --save-baseline")
+
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        print(f"{'case':<28} {'ns/op':>10} {'±mad':>8} {'B/op':>8} {'baseline':>10}  verdict")
+        for name, r in results.items():
+            base = r.get('baseline_ns_per_op')
+            print(f"{name:<28} {r['ns_per_op']:>10.0f} {r['mad_ns']:>8.0f} "
+                  f"{r['alloc_bytes_per_op']:>8.0f} {base if base is not None else '-':>10}  "
+                  f"{r.get('verdict', '')}")
+
+    if regressions:
+        print(f"❌ Regressed: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
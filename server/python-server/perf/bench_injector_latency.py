@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Receipt-to-injection tail latency: in-process injection vs the injector process.
+
+Starts the server in this interpreter with the null backend, drives it from
+separate client processes (so only server threads compete for the GIL) and
+reports the injector's latency histogram for each mode. Every frame produces
+a delta, so the run fails unless each frame the clients had acked was either
+injected or counted as dropped on a full ring.
+
+    python3 perf/bench_injector_latency.py --clients 8 --seconds 5
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def load_client(port, seconds, frames_per_write, acked):
+    """Send scroll frames as fast as acks come back; puts the number of frames acked"""
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    payload = b'{"a":1,"p":2500}\n' * frames_per_write
+    ack_bytes = len(b'{"s":"ok"}\n') * frames_per_write
+    frames = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sock.sendall(payload)
+        received = 0
+        while received < ack_bytes:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            received += len(chunk)
+        frames += received // len(b'{"s":"ok"}\n')
+        if received < ack_bytes:
+            break
+    sock.close()
+    acked.put(frames)
+
+
+def run_mode(mode, clients, seconds, frames_per_write):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+        server = tcp_server.WatchScrollerServer(host='127.0.0.1', port=0, backend=tcp_server.NullBackend(),
+                                                injector=mode, advertise=False, frame_rate_limit=None, displacement_rate_limit=None)
+    server.log = lambda message: None
+    threading.Thread(target=server.start, daemon=True).start()
+    server.ready.wait()
+
+    acked = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=load_client, args=(server.port, seconds, frames_per_write, acked))
+               for _ in range(clients)]
+    for worker in workers:
+        worker.start()
+    frames = sum(acked.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    # Let the injector drain
+    deadline = time.monotonic() + 2
+    while server.injector.queue_depth() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.05)
+
+    summary = server.injector.latency_histogram().summary()
+    dropped = server.injector.dropped
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        server.stop()
+    return frames, dropped, summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--frames-per-write', type=int, default=1)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'mode':<8} {'frames':>9} {'injected':>9} {'dropped':>8} {'p50µs':>7} {'p90µs':>7} {'p99µs':>7} "
+          f"{'p99.9µs':>8} {'maxµs':>8}")
+    for mode in ('inline', 'process'):
+        frames, dropped, s = run_mode(mode, args.clients, args.seconds, args.frames_per_write)
+        print(f"{mode:<8} {frames:>9} {s['count']:>9} {dropped:>8} {s['p50_us']:>7} {s['p90_us']:>7} "
+              f"{s['p99_us']:>7} {s['p999_us']:>8} {s['max_us']:>8}")
+        if s['count'] + dropped != frames:
+            failures.append(f"{mode}: {frames} frames acked but {s['count']} deltas injected "
+                            f"and {dropped} dropped")
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Cost of the profiling hook on the per-recv path.
+
+Runs the real handle_client loop against a scripted socket and compares it,
+per read, with a bare recv + handle_data loop. It does this while the
+profiler is off (must be negligible) and while a sampling or cProfile
+capture is running (expected to cost something). The idle comparison runs in
+interleaved rounds. It fails only when the median overhead is above
+--max-overhead and also above --noise-factor MADs of the per-round
+differences. Capture reports go to a temporary directory that is removed
+afterwards.
+"""
+import argparse
+import contextlib
+import gc
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from bench_hot_path import ADDRESS, NullSocket
+
+DATA = b'{"a":1,"p":950}\n{"a":1,"p":1200}\n'
+
+
+class ScriptedSocket(NullSocket):
+    """Returns DATA from recv() `reads` times, then EOF"""
+    def __init__(self, reads):
+        self.remaining = reads
+
+    def recv(self, size):
+        if not self.remaining:
+            return b''
+        self.remaining -= 1
+        return DATA
+
+    def close(self):
+        pass
+
+
+def per_read_ns(loop, reads):
+    sock = ScriptedSocket(reads)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter_ns()
+        loop(sock)
+        return (time.perf_counter_ns() - start) / reads
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reads', type=int, default=5000, help='recv() calls per timed run')
+    parser.add_argument('--rounds', type=int, default=15, help='interleaved idle rounds')
+    parser.add_argument('--max-overhead', type=float, default=0.02,
+                        help='fail if the idle hook costs more than this fraction')
+    parser.add_argument('--noise-factor', type=float, default=3.0,
+                        help='the overhead must also exceed this many MADs')
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+    server = tcp_server.WatchScrollerServer(backend=tcp_server.NullBackend(), frame_rate_limit=None,
+                                            displacement_rate_limit=None)
+    server.log = server.profiler.log = lambda message: None
+    server.running = True  # handle_client loops only while the server runs
+
+    def bare(sock):
+        server.open_session(sock)
+        while True:
+            data = sock.recv(1024)
+            if not data:
+                break
+            server.handle_data(data, sock, ADDRESS)
+        server.detach_session(sock)
+
+    def real(sock):
+        server.handle_client(sock, ADDRESS)
+
+    for loop in (bare, real):
+        per_read_ns(loop, args.reads)  # Warm up
+
+    # Alternate which loop goes first so drift on a busy machine hits both equally
+    bare_ns, real_ns = [], []
+    for round_index in range(args.rounds):
+        order = ((bare, bare_ns), (real, real_ns))
+        for loop, samples in (order if round_index % 2 == 0 else order[::-1]):
+            samples.append(per_read_ns(loop, args.reads))
+    base = statistics.median(bare_ns)
+    differences = [r - b for b, r in zip(bare_ns, real_ns)]
+    overhead = statistics.median(differences)
+    mad = statistics.median(abs(d - overhead) for d in differences)
+    results = {'bare loop': base, 'hook idle': base + overhead}
+
+    with tempfile.TemporaryDirectory() as directory:
+        server.profiler.output_dir = directory
+        duration = args.reads * base / 1e9 * 5 + 1
+        for mode in ('sample', 'cprofile'):
+            for trace_memory in (False, True):
+                server.profiler.start(duration, mode, trace_memory)
+                time.sleep(0.05)
+                results[f"hook {mode}{'+mem' if trace_memory else ''}"] = statistics.median(
+                    per_read_ns(real, args.reads) for _ in range(3))
+                while server.profiler.active:
+                    time.sleep(0.1)
+
+    for name, ns in results.items():
+        print(f"{name:<20} {ns:>10.0f} ns/read  {(ns - base) / base:+7.1%}")
+    print(f"idle overhead {overhead:+.0f} ns/read ± {mad:.0f} (MAD over {args.rounds} rounds)")
+
+    if overhead > base * args.max_overhead and overhead > args.noise_factor * mad:
+        print(f"❌ Idle profiling hook overhead {overhead / base:.1%} exceeds {args.max_overhead:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Time to first scroll after a reconnect: status handshake vs resume token.
+
+Starts the server in this interpreter with the null backend and a client
+process that repeatedly drops its connection and reconnects. It times from
+connect() to the ack of the first scroll frame:
+
+- status: the pre-resume flow, which waits for a status exchange (`a:2`)
+  before scrolling on a fresh session with cold physics.
+- resume: `a:4` with the token from the last session and the first scroll
+  frame in one write. It reattaches to the previous session.
+
+The client reaches the server through a loopback proxy that holds each
+chunk for half of --rtt-ms in each direction, standing in for the Wi-Fi hop.
+Connection setup with the proxy is not delayed, so both flows pay the same
+for it. Modes alternate across rounds so drift affects both equally.
+Discovery (Bonjour/Supabase) runs on the phone before either flow and is not
+measured.
+
+    python3 perf/bench_reconnect.py --rtt-ms 20 --reconnects 100 --rounds 3
+    python3 perf/bench_reconnect.py --rtt-ms 0      # direct loopback
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+ACK = b'{"s":"ok"}\n'
+
+
+def pipe(source, sink, delay):
+    """Forward source to sink, delivering each chunk `delay` seconds after it was read"""
+    pending = queue.Queue()
+
+    def deliver():
+        while True:
+            due, chunk = pending.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                if not chunk:
+                    sink.shutdown(socket.SHUT_WR)
+                    return
+                sink.sendall(chunk)
+            except OSError:
+                return
+
+    deliverer = threading.Thread(target=deliver, daemon=True)
+    deliverer.start()
+    while True:
+        try:
+            chunk = source.recv(65536)
+        except OSError:
+            chunk = b''
+        pending.put((time.monotonic() + delay, chunk))
+        if not chunk:
+            break
+    deliverer.join()
+
+
+def link(client, upstream_port, delay):
+    upstream = connect(upstream_port)
+    client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    directions = [threading.Thread(target=pipe, args=(client, upstream, delay), daemon=True),
+                  threading.Thread(target=pipe, args=(upstream, client, delay), daemon=True)]
+    for direction in directions:
+        direction.start()
+    for direction in directions:
+        direction.join()
+    client.close()
+    upstream.close()
+
+
+def delay_proxy(listener, upstream_port, delay):
+    while True:
+        client, _ = listener.accept()
+        threading.Thread(target=link, args=(client, upstream_port, delay), daemon=True).start()
+
+
+def connect(port):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def read_until(sock, buffer, done):
+    while not done(buffer):
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        buffer += chunk
+    return buffer
+
+
+def reconnect_client(port, mode, reconnects, results):
+    """Connect-to-first-ack times in µs, and how many resumes were not reattached"""
+    sock = connect(port)
+    sock.sendall(b'{"a":2}\n')
+    status = read_until(sock, b'', lambda buffer: buffer.rstrip().endswith(b'}'))
+    token = json.loads(status)['resumeToken']
+    seq = 0
+    samples = []
+    missed = 0
+    for _ in range(reconnects):
+        sock.close()
+        seq += 1
+        frame = b'{"a":1,"p":950,"q":%d}\n' % seq
+        start = time.perf_counter_ns()
+        sock = connect(port)
+        if mode == 'status':
+            sock.sendall(b'{"a":2}\n')
+            read_until(sock, b'', lambda buffer: buffer.rstrip().endswith(b'}'))
+            sock.sendall(frame)
+            read_until(sock, b'', lambda buffer: ACK in buffer)
+        else:
+            sock.sendall(b'{"a":4,"k":"%s"}\n' % token.encode() + frame)
+            reply = read_until(sock, b'', lambda buffer: ACK in buffer)
+            if b'"s":"resumed"' not in reply:
+                missed += 1
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    sock.close()
+    results.put((samples, missed))
+
+
+def measure(port, mode, reconnects):
+    results = multiprocessing.Queue()
+    client = multiprocessing.Process(target=reconnect_client, args=(port, mode, reconnects, results))
+    client.start()
+    samples, missed = results.get()
+    client.join()
+    return samples, missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rtt-ms', type=float, default=20.0,
+                        help='round trip added by the proxy; 0 to connect directly')
+    parser.add_argument('--reconnects', type=int, default=100, help='reconnects per mode per round')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+        server = tcp_server.WatchScrollerServer(host='127.0.0.1', port=0, backend=tcp_server.NullBackend(),
+                                                advertise=False, frame_rate_limit=None,
+                                                displacement_rate_limit=None)
+    server.log = lambda message: None
+    threading.Thread(target=server.start, daemon=True).start()
+    server.ready.wait()
+    port = server.port
+    if args.rtt_ms:
+        listener = socket.create_server(('127.0.0.1', 0), backlog=128)
+        threading.Thread(target=delay_proxy, args=(listener, server.port, args.rtt_ms / 2000),
+                         daemon=True).start()
+        port = listener.getsockname()[1]
+
+    modes = ('status', 'resume')
+    samples = {mode: [] for mode in modes}
+    missed = 0
+    for _ in range(args.rounds):
+        for mode in modes:
+            values, mode_missed = measure(port, mode, args.reconnects)
+            samples[mode] += values
+            missed += mode_missed
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        server.stop()
+
+    print(f"rtt {args.rtt_ms:g} ms")
+    print(f"{'flow':<8} {'reconnects':>10} {'p50ms':>7} {'p90ms':>7} {'p99ms':>7}")
+    for mode, values in samples.items():
+        ordered = sorted(values)
+
+        def pick(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        print(f"{mode:<8} {len(ordered):>10} {pick(0.5) / 1000:>7.2f} {pick(0.9) / 1000:>7.2f} "
+              f"{pick(0.99) / 1000:>7.2f}")
+    if missed:
+        print(f"❌ {missed} resumes were answered with a new session")
+    sys.exit(1 if missed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Startup budget: import cost of tcp_server and cold start to first accept.
+
+Runs `python -X importtime -c "import tcp_server"` in fresh interpreters and
+reports the cumulative import time and the heaviest imports. It fails if a
+module that should load lazily shows up, e.g. pyautogui, zeroconf, requests
+or pstats. Then it launches tcp_server.py repeatedly and times spawn to the
+first answered ping. Bytecode caches are primed first, so this measures a
+normal cold start rather than a first run after an edit.
+
+    python3 perf/bench_startup.py
+    python3 perf/bench_startup.py --import-budget-ms 80 --accept-budget-ms 400
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Loaded on first use (backends, discovery, profiling, injector process); never at import
+LAZY_MODULES = ('pyautogui', 'PIL', 'Quartz', 'zeroconf', 'requests', 'cProfile', 'pstats',
+                'multiprocessing.shared_memory')
+
+
+def child_env():
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def import_profile():
+    """One -X importtime run: (cumulative µs of tcp_server, {module: cumulative µs})"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import tcp_server'],
+                            cwd=SERVER_DIR, env=child_env(), capture_output=True, text=True)
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative)
+    return modules.get('tcp_server', 0), modules
+
+
+def first_accept(port, timeout=10.0):
+    """Seconds from spawning tcp_server.py until a ping on a fresh connection is answered"""
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, 'tcp_server.py', '--port', str(port), '--no-advertise'],
+                              cwd=SERVER_DIR, env=child_env(),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = start + timeout
+        while time.perf_counter() < deadline:
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1) as sock:
+                    sock.sendall(b'{"a":3}\n')
+                    if sock.recv(256):
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.002)
+        return None
+    finally:
+        server.terminate()
+        server.wait(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--port', type=int, default=18891)
+    parser.add_argument('--import-budget-ms', type=float, default=60.0)
+    parser.add_argument('--accept-budget-ms', type=float, default=250.0)
+    parser.add_argument('--top', type=int, default=8, help='heaviest imports to list')
+    args = parser.parse_args()
+
+    import_profile()  # Prime __pycache__
+    runs = [import_profile() for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in runs) / 1000
+    modules = runs[-1][1]
+
+    failures = []
+    lazy = [name for name in LAZY_MODULES if any(runs_modules.get(name) for _, runs_modules in runs)]
+    if lazy:
+        failures.append(f"imported eagerly: {', '.join(lazy)}")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import tcp_server {import_ms:.1f} ms > budget {args.import_budget_ms:.0f} ms")
+
+    accepts = []
+    for _ in range(args.runs):
+        elapsed = first_accept(args.port)
+        if elapsed is None:
+            failures.append("server never answered")
+            break
+        accepts.append(elapsed * 1000)
+    accept_ms = statistics.median(accepts) if accepts else float('inf')
+    if accept_ms > args.accept_budget_ms:
+        failures.append(f"first accept {accept_ms:.1f} ms > budget {args.accept_budget_ms:.0f} ms")
+
+    print(f"⏱️  import tcp_server   median {import_ms:6.1f} ms  (budget {args.import_budget_ms:.0f} ms)")
+    print(f"⏱️  spawn → first ping  median {accept_ms:6.1f} ms  (budget {args.accept_budget_ms:.0f} ms)")
+    print("   heaviest imports (cumulative):")
+    heaviest = sorted(((us, name) for name, us in modules.items() if name != 'tcp_server'), reverse=True)
+    for us, name in heaviest[:args.top]:
+        print(f"   {us / 1000:7.1f} ms  {name}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
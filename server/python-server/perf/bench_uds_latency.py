@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Ack round-trip latency over loopback TCP vs the Unix domain socket listener.
+
+Starts one server in this interpreter with the null backend, listening on an
+ephemeral TCP port and a Unix socket in a temporary directory. A client
+process then sends ack-paced scroll frames over each transport in turn.
+Transports alternate across rounds so drift affects both equally.
+
+    python3 perf/bench_uds_latency.py --frames 20000 --rounds 3
+"""
+import argparse
+import contextlib
+import multiprocessing
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+FRAME = b'{"a":1,"p":950}\n'
+ACK = b'{"s":"ok"}\n'
+
+
+def connect(address):
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(address)
+    else:
+        sock = socket.create_connection(address)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def rtt_client(address, frames, results):
+    """Round-trip times in µs for ack-paced frames on one connection"""
+    sock = connect(address)
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        sock.sendall(FRAME)
+        received = 0
+        while received < len(ACK):
+            chunk = sock.recv(64)
+            if not chunk:
+                raise ConnectionError("server closed the connection")
+            received += len(chunk)
+        samples.append((time.perf_counter_ns() - start) / 1000)
+    sock.close()
+    results.put(samples)
+
+
+def measure(address, frames):
+    results = multiprocessing.Queue()
+    client = multiprocessing.Process(target=rtt_client, args=(address, frames, results))
+    client.start()
+    samples = results.get()
+    client.join()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=20000, help='frames per transport per round')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'scroll.sock')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            import tcp_server
+            server = tcp_server.WatchScrollerServer(host='127.0.0.1', port=0, backend=tcp_server.NullBackend(),
+                                                    advertise=False, unix_socket=path,
+                                                    frame_rate_limit=None, displacement_rate_limit=None)
+        server.log = lambda message: None
+        threading.Thread(target=server.start, daemon=True).start()
+        server.ready.wait()
+
+        transports = {'tcp': ('127.0.0.1', server.port), 'unix': path}
+        samples = {name: [] for name in transports}
+        for _ in range(args.rounds):
+            for name, address in transports.items():
+                samples[name] += measure(address, args.frames)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            server.stop()
+
+    print(f"{'transport':<10} {'frames':>8} {'p50µs':>7} {'p90µs':>7} {'p99µs':>7} {'p99.9µs':>8} {'frames/s':>9}")
+    for name, values in samples.items():
+        ordered = sorted(values)
+
+        def pick(fraction):
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+        rate = 1e6 / statistics.fmean(ordered)
+        print(f"{name:<10} {len(ordered):>8} {pick(0.5):>7.1f} {pick(0.9):>7.1f} {pick(0.99):>7.1f} "
+              f"{pick(0.999):>8.1f} {rate:>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Connections/sec and frames/sec against worker count.
+
+Launches tcp_server.py with the null backend for each worker count, then
+drives it from client processes: a reconnect storm (connect, one frame, close)
+and a sustained ack-paced scroll stream. One worker runs with the injector
+process so every configuration shares the same injection path.
+
+    python3 perf/bench_worker_scaling.py --workers 1 2 4 --clients 16
+"""
+import argparse
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'tcp_server.py')
+FRAME = b'{"a":1,"p":2500}\n'
+ACK = b'{"s":"ok"}\n'
+
+
+def wait_for_port(port, timeout=15.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+def storm_client(port, seconds, counter):
+    done = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            sock = socket.create_connection(('127.0.0.1', port), timeout=2)
+            sock.sendall(FRAME)
+            sock.recv(64)
+            sock.close()
+            done += 1
+        except OSError:
+            pass
+    with counter.get_lock():
+        counter.value += done
+
+
+def stream_client(port, seconds, counter):
+    sock = socket.create_connection(('127.0.0.1', port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    done = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sock.sendall(FRAME)
+        received = 0
+        while received < len(ACK):
+            chunk = sock.recv(64)
+            if not chunk:
+                break
+            received += len(chunk)
+        done += 1
+    sock.close()
+    with counter.get_lock():
+        counter.value += done
+
+
+def drive(target, port, clients, seconds):
+    counter = multiprocessing.Value('q', 0)
+    processes = [multiprocessing.Process(target=target, args=(port, seconds, counter)) for _ in range(clients)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return counter.value / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--port', type=int, default=18890)
+    args = parser.parse_args()
+
+    print(f"{'workers':>7} {'conn/s':>10} {'frames/s':>10}")
+    for workers in args.workers:
+        command = [sys.executable, SERVER, '--port', str(args.port), '--backend', 'null', '--no-advertise',
+                   '--backlog', '1024', '--workers', str(workers),
+                   '--max-clients', '0', '--max-frame-rate', '0', '--max-displacement-rate', '0']
+        if workers == 1:
+            command += ['--injector', 'process']
+        server = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            if not wait_for_port(args.port):
+                print(f"{workers:>7} server did not start")
+                continue
+            time.sleep(0.5)  # Let every worker bind
+            conns = drive(storm_client, args.port, args.clients, args.seconds)
+            frames = drive(stream_client, args.port, args.clients, args.seconds)
+            print(f"{workers:>7} {conns:>10.0f} {frames:>10.0f}")
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+            time.sleep(0.5)
+
+
+if __name__ == '__main__':
+    main()
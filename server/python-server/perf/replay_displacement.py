@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Replay a crown session and check injected vs intended scroll displacement.
+
+Feeds deltas through perform_mac_scroll on event time with a counting null
+backend, for line output and pixel-precise output, and checks that the total
+injected displacement stays within one output unit of what the physics asked
+for. The old truncating conversion is shown for comparison.
+
+    python3 perf/replay_displacement.py                   # synthetic session
+    python3 perf/replay_displacement.py --input deltas.json   # [[pixels, dt_ms], ...]
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def synthetic_session(seed=7):
+    """Slow turns, fast spins and reversals, as [pixels, dt_ms] pairs"""
+    rng = random.Random(seed)
+    deltas = []
+    for phase in range(40):
+        sign = 1 if phase % 3 else -1
+        if phase % 2:
+            deltas += [[sign * rng.randint(60, 850), rng.randint(80, 200)] for _ in range(rng.randint(5, 30))]
+        else:
+            deltas += [[sign * rng.randint(1500, 6000), rng.randint(10, 40)] for _ in range(rng.randint(5, 30))]
+        deltas.append([sign, 600])  # Pause
+    return deltas
+
+
+def replay(tcp_server, deltas, resolution):
+    backend = tcp_server.NullBackend(resolution=resolution)
+    server = tcp_server.WatchScrollerServer(backend=backend, advertise=False)
+    server.log = lambda message: None
+    session = tcp_server.ScrollSession()
+    event_time = 1000.0
+    intended = 0.0
+    truncated = 0
+    for pixels, dt_ms in deltas:
+        event_time += dt_ms / 1000.0
+        final_scroll = server.perform_mac_scroll(pixels, "vertical", session, event_time)
+        if final_scroll is None:
+            continue
+        intended -= final_scroll / server.scroll_unit * resolution
+        truncated += -int(final_scroll / server.scroll_unit * resolution)
+    return intended, backend.total, truncated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--input', help='JSON list of [pixels, dt_ms] pairs')
+    args = parser.parse_args()
+
+    if args.input:
+        with open(args.input) as f:
+            deltas = json.load(f)
+    else:
+        deltas = synthetic_session()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+        results = {resolution: replay(tcp_server, deltas, resolution) for resolution in (1, 10)}
+
+    failed = False
+    print(f"{len(deltas)} deltas")
+    print(f"{'output':<14} {'intended':>10} {'injected':>10} {'error':>7} {'truncating':>11}")
+    for resolution, (intended, injected, truncated) in results.items():
+        label = "lines" if resolution == 1 else f"pixels (x{resolution})"
+        error = injected - intended
+        failed |= abs(error) >= 1
+        print(f"{label:<14} {intended:>10.1f} {injected:>10} {error:>+7.2f} {truncated - intended:>+11.1f}")
+    if failed:
+        print("❌ Injected displacement drifted by a full unit or more")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
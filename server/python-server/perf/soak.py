@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Soak test: compressed connect/scroll/disconnect cycles with leak detection.
+
+Runs the server in this interpreter with the null backend on an ephemeral
+port and drives it with short-lived clients (status, resume, scroll frames,
+batches, disconnect). Every few cycles it samples traced Python memory,
+thread count and open file descriptors; after warm-up, a growth trend in any
+of them fails the run. After stop() it checks that client threads and sockets
+were all released.
+
+    python3 perf/soak.py                       # 10k connections
+    python3 perf/soak.py --cycles 100000       # hours of traffic, compressed
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import socket
+import sys
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+DECODER = json.JSONDecoder()  # A fresh decoder per cycle leaves cyclic garbage that reads as a leak
+
+
+def open_fds():
+    for path in ('/proc/self/fd', '/dev/fd'):
+        if os.path.isdir(path):
+            return len(os.listdir(path))
+    return -1
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def slope(samples):
+    """Least-squares growth per sample"""
+    n = len(samples)
+    if n < 2:
+        return 0.0
+    mean_x = (n - 1) / 2
+    mean_y = sum(samples) / n
+    numerator = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(samples))
+    denominator = sum((x - mean_x) ** 2 for x in range(n))
+    return numerator / denominator
+
+
+def read_line(sock, buffer):
+    while b'\n' not in buffer:
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ConnectionError("server closed the connection")
+        buffer += chunk
+    line, _, rest = buffer.partition(b'\n')
+    return line, rest
+
+
+def client_cycle(port, frames, token):
+    """One bridge lifetime; returns the resume token for the next cycle"""
+    sock = socket.create_connection(('127.0.0.1', port), timeout=5)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        buffer = b''
+        if token:
+            sock.sendall(b'{"a":4,"k":"%s"}\n' % token.encode())
+            line, buffer = read_line(sock, buffer)
+            token = json.loads(line)["k"]
+        else:
+            # Status replies are not newline-terminated; a flow-control advert may follow
+            sock.sendall(b'{"a":2,"c":["fc"]}\n')
+            status, _ = DECODER.raw_decode(sock.recv(4096).decode())
+            token = status["resumeToken"]
+        seq = 0
+        for i in range(frames):
+            seq += 1
+            if i % 4 == 3:
+                sock.sendall(b'{"a":5,"t":%f,"b":[[300,-8],[300,0]],"q":%d}\n' % (time.time(), seq))
+            else:
+                sock.sendall(b'{"a":1,"p":%d,"q":%d}\n' % (900 if i % 2 else -900, seq))
+            line, buffer = read_line(sock, buffer)
+            while line != b'{"s":"ok"}':  # Skip flow-control adverts
+                line, buffer = read_line(sock, buffer)
+    finally:
+        sock.close()
+    return token
+
+
+def run(args):
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import tcp_server
+        server = tcp_server.WatchScrollerServer(host='127.0.0.1', port=0, backend=tcp_server.NullBackend(),
+                                                session_grace_period=args.grace, advertise=False,
+                                                # Resumed sessions keep their buckets; the compressed
+                                                # traffic here would otherwise be throttled
+                                                frame_rate_limit=None, displacement_rate_limit=None)
+    server.log = lambda message: None
+    baseline_threads = threading.active_count()
+    baseline_fds = open_fds()
+    accept_thread = threading.Thread(target=server.start, daemon=True)
+    accept_thread.start()
+    server.ready.wait()
+
+    tracemalloc.start()
+    samples = []
+    token = None
+    start = time.perf_counter()
+    for cycle in range(1, args.cycles + 1):
+        # Mostly resumes, with a fresh session every few cycles
+        token = client_cycle(server.port, args.frames, None if cycle % 5 == 0 else token)
+        if cycle % args.sample_every == 0:
+            time.sleep(0.01)  # Let the client thread run its finally block
+            traced, _ = tracemalloc.get_traced_memory()
+            samples.append({"cycle": cycle, "traced": traced,
+                            "threads": threading.active_count(), "fds": open_fds(),
+                            "clients": len(server.clients), "sessions": len(server.sessions)})
+            if args.verbose:
+                print(samples[-1])
+    elapsed = time.perf_counter() - start
+    _, traced_peak = tracemalloc.get_traced_memory()
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        server.stop()
+    accept_thread.join(timeout=2)
+    deadline = time.monotonic() + 2
+    while threading.active_count() > baseline_threads and time.monotonic() < deadline:
+        time.sleep(0.05)
+    tracemalloc.stop()
+
+    # Judge trends after warm-up so caches and the session table can fill first
+    steady = samples[len(samples) // 4:]
+    per_cycle_bytes = slope([s["traced"] for s in steady]) / args.sample_every
+    failures = []
+    if per_cycle_bytes > args.max_bytes_per_cycle:
+        failures.append(f"traced memory grows {per_cycle_bytes:.1f} B/cycle (limit {args.max_bytes_per_cycle})")
+    for key in ("threads", "fds", "clients", "sessions"):
+        values = [s[key] for s in steady]
+        if len(values) < 2:
+            continue
+        # A plateau jitters (sessions track connection rate × grace period); a leak climbs
+        earlier = sum(values[:len(values) // 2]) / (len(values) // 2)
+        later = sum(values[len(values) // 2:]) / (len(values) - len(values) // 2)
+        if later - earlier > args.slack + 0.1 * earlier:
+            failures.append(f"{key} keep growing: {values[0]} → {values[-1]}")
+    if threading.active_count() > baseline_threads:
+        failures.append(f"{threading.active_count() - baseline_threads} threads still alive after stop()")
+    if open_fds() > baseline_fds:
+        failures.append(f"{open_fds() - baseline_fds} file descriptors still open after stop()")
+
+    last = samples[-1] if samples else {}
+    print(f"🧪 {args.cycles} cycles × {args.frames} frames in {elapsed:.1f}s "
+          f"({args.cycles / elapsed:.0f} connections/s)")
+    print(f"   peak RSS {peak_rss_mb():.1f} MB, traced peak {traced_peak / 1024:.0f} KB, "
+          f"{per_cycle_bytes:+.1f} B/cycle after warm-up")
+    print(f"   last sample: threads {last.get('threads')}, fds {last.get('fds')}, "
+          f"clients {last.get('clients')}, sessions {last.get('sessions')}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=10000)
+    parser.add_argument('--frames', type=int, default=8, help='scroll frames per connection')
+    parser.add_argument('--sample-every', type=int, default=250)
+    parser.add_argument('--grace', type=float, default=0.5, help='session grace period (seconds)')
+    parser.add_argument('--max-bytes-per-cycle', type=float, default=16.0)
+    parser.add_argument('--slack', type=int, default=2, help='allowed jitter in thread/fd/session counts')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+    sys.exit(0 if run(args) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""On-demand profiling for the WatchScroller server.
+
+A capture is time-boxed and runs alongside normal traffic: either a stack
+sampler over every thread (default, low overhead) or cProfile, plus a
+tracemalloc diff between the start and end of the window. Results go to a
+text report in the output directory and the top hot spots are logged.
+"""
+import collections
+import io
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+PROFILE_MODES = ("sample", "cprofile")
+# Longest capture accepted; the hooks and tracemalloc stay on until it ends
+MAX_PROFILE_SECONDS = 300.0
+# Before 3.12 cProfile hooks sys.setprofile, which only sees the calling thread
+PER_THREAD_CPROFILE = sys.version_info < (3, 12)
+
+
+class ProfileCapture:
+    def __init__(self, log, output_dir="profiles", sample_interval=0.005):
+        self.log = log
+        self.output_dir = output_dir
+        self.sample_interval = sample_interval
+        self.active = False  # Read on the hot path; everything else is off it
+        self.lock = threading.Lock()
+        self.mode = None
+        self.thread_profiles = {}  # thread ident -> cProfile.Profile (PER_THREAD_CPROFILE only)
+        self.global_profile = None  # Python 3.12+ profiles all threads from one object
+        self.last_stats = None
+
+    def start(self, seconds=10.0, mode="sample", trace_memory=True):
+        """Begin a capture in the background; False if one is already running"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode '{mode}' (choose from {', '.join(PROFILE_MODES)})")
+        if not 0 < seconds <= MAX_PROFILE_SECONDS:
+            raise ValueError(f"Profile duration must be more than 0 and at most {MAX_PROFILE_SECONDS:.0f}s, "
+                             f"got {seconds}")
+        with self.lock:
+            if self.active:
+                return False
+            self.active = True
+            self.mode = mode
+        thread = threading.Thread(target=self._capture, args=(seconds, mode, trace_memory), daemon=True)
+        thread.start()
+        return True
+
+    def profile_call(self, fn, *args):
+        """Run fn under this thread's profiler while a cProfile capture is active"""
+        if self.mode != "cprofile" or not PER_THREAD_CPROFILE:
+            return fn(*args)
+        ident = threading.get_ident()
+        profile = self.thread_profiles.get(ident)
+        if profile is None:
+            import cProfile
+            profile = self.thread_profiles[ident] = cProfile.Profile()
+        return profile.runcall(fn, *args)
+
+    def _capture(self, seconds, mode, trace_memory):
+        self.log(f"🔬 Profiling started: {mode} for {seconds:.0f}s")
+        # One frame per allocation keeps tracemalloc's own overhead tolerable under load
+        started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+        if started_tracemalloc:
+            tracemalloc.start(1)
+        memory_before = tracemalloc.take_snapshot() if trace_memory else None
+
+        try:
+            if mode == "sample":
+                hot_spots, report = self._sample(seconds)
+            else:
+                hot_spots, report = self._cprofile(seconds)
+            if trace_memory:
+                memory_report = self._memory_report(memory_before, tracemalloc.take_snapshot())
+            else:
+                memory_report = "Memory tracing disabled for this capture."
+            path = self._write_report(mode, seconds, report, memory_report)
+            self.log(f"🔬 Profile written to {path}")
+            for line in hot_spots[:5]:
+                self.log(f"🔥 {line}")
+        except Exception as e:
+            self.log(f"❌ Profiling failed: {e}")
+        finally:
+            if started_tracemalloc:
+                tracemalloc.stop()
+            self.thread_profiles = {}
+            self.global_profile = None
+            with self.lock:
+                self.active = False
+                self.mode = None
+
+    def _sample(self, seconds):
+        """Periodically record every other thread's stack via sys._current_frames()"""
+        own = threading.get_ident()
+        leaf_counts = collections.Counter()
+        inclusive_counts = collections.Counter()
+        stack_counts = collections.Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                samples += 1
+                leaf_counts[stack[0]] += 1
+                for entry in set(entry.rsplit(':', 1)[0] for entry in stack):
+                    inclusive_counts[entry] += 1
+                stack_counts[';'.join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+        total = max(samples, 1)
+        hot_spots = [f"{count / total:6.1%} self  {location}" for location, count in leaf_counts.most_common(20)]
+        lines = [f"Samples: {samples} (wall-clock every {self.sample_interval * 1000:.1f}ms, all threads; "
+                 f"threads blocked in I/O show up at their wait site)", "",
+                 "Top self (leaf) locations:"]
+        lines += hot_spots
+        lines += ["", "Top inclusive functions:"]
+        lines += [f"{count / total:6.1%} incl  {function}" for function, count in inclusive_counts.most_common(20)]
+        lines += ["", "Collapsed stacks (flamegraph.pl / speedscope input):"]
+        lines += [f"{stack} {count}" for stack, count in stack_counts.most_common()]
+        return hot_spots, '\n'.join(lines)
+
+    def _cprofile(self, seconds):
+        # Imported here so servers that never profile do not load pstats at startup
+        import cProfile
+        import pstats
+        if not PER_THREAD_CPROFILE:
+            # cProfile sits on sys.monitoring here, which sees every thread
+            self.global_profile = cProfile.Profile()
+            self.global_profile.enable()
+            time.sleep(seconds)
+            self.global_profile.disable()
+            profiles = [self.global_profile]
+        else:
+            # Client threads profile themselves through profile_call()
+            time.sleep(seconds)
+            profiles = list(self.thread_profiles.values())
+
+        if not profiles:
+            return [], "No profiled calls were recorded during the capture window."
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        self.last_stats = stats
+
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats('cumulative').print_stats(40)
+        stats.sort_stats('tottime').print_stats(20)
+        hot_spots = []
+        for (filename, lineno, name), (cc, nc, tottime, cumtime, callers) in sorted(
+                stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:20]:
+            hot_spots.append(f"{tottime * 1000:8.1f}ms self  {os.path.basename(filename)}:{name}:{lineno} ({nc} calls)")
+        return hot_spots, out.getvalue()
+
+    def _memory_report(self, before, after):
+        lines = ["Top allocation growth during capture (tracemalloc):"]
+        for stat in after.compare_to(before, 'lineno')[:15]:
+            lines.append(str(stat))
+        current, peak = tracemalloc.get_traced_memory()
+        lines.append(f"Traced memory: current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB")
+        return '\n'.join(lines)
+
+    def _write_report(self, mode, seconds, report, memory_report):
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.output_dir, f"profile-{stamp}-{mode}.txt")
+        with open(path, 'w') as f:
+            f.write(f"WatchScroller profile: mode={mode} duration={seconds:.1f}s\n\n")
+            f.write(report)
+            f.write("\n\n")
+            f.write(memory_report)
+            f.write("\n")
+        if mode == "cprofile" and self.last_stats is not None:
+            self.last_stats.dump_stats(path[:-len(".txt")] + ".pstats")
+            self.last_stats = None
+        return path
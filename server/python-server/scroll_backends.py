@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Scroll output backends.
+
+Each backend has a `name`, a `resolution` (output units per wheel line),
+`scroll(amount, direction)` and `scroll_vector(vertical, horizontal)`, which
+posts both axes as one event where the platform API allows it. Heavy libraries (PyAutoGUI pulls in Pillow,
+pyscreeze, pymsgbox, ...; Quartz pulls in pyobjc) are imported on first use,
+or earlier from a background thread via `warm_up()`, so importing this module
+or starting the listener never pays for them.
+"""
+import importlib.util
+import threading
+
+
+class PyAutoGUIBackend:
+    """Scroll output through PyAutoGUI (inverted wheel units)"""
+    name = "pyautogui"
+    resolution = 1  # Output units per wheel line
+
+    def __init__(self):
+        self.pyautogui = None
+        self.lock = threading.Lock()
+
+    def warm_up(self):
+        with self.lock:
+            if self.pyautogui is None:
+                import pyautogui
+                # Disable PyAutoGUI's automatic pause for smoother scrolling
+                pyautogui.PAUSE = 0
+                pyautogui.MINIMUM_DURATION = 0
+                pyautogui.MINIMUM_SLEEP = 0
+                self.pyautogui = pyautogui
+        return self.pyautogui
+
+    def scroll(self, amount, direction):
+        pyautogui = self.pyautogui or self.warm_up()
+        if direction == "vertical":
+            pyautogui.scroll(amount)
+        else:
+            pyautogui.hscroll(amount)
+
+    def scroll_vector(self, vertical, horizontal):
+        # PyAutoGUI has no combined call, so a diagonal is two events
+        pyautogui = self.pyautogui or self.warm_up()
+        if vertical:
+            pyautogui.scroll(vertical)
+        if horizontal:
+            pyautogui.hscroll(horizontal)
+
+
+class AppleScriptBackend:
+    """Fallback when PyAutoGUI is missing: arrow key presses via System Events"""
+    name = "applescript"
+    resolution = 1
+
+    def warm_up(self):
+        pass
+
+    def scroll(self, amount, direction):
+        if direction == "vertical":
+            # AppleScript scroll - negative Y = scroll up
+            script = f'''
+                tell application "System Events"
+                    tell process "Safari" to set frontmost to true
+                    key code 125 using {{}}
+                end tell
+                ''' if amount < 0 else f'''
+                tell application "System Events"
+                    tell process "Safari" to set frontmost to true
+                    key code 126 using {{}}
+                end tell
+                '''
+        else:
+            script = f'''
+                tell application "System Events"
+                    tell process "Safari" to set frontmost to true
+                    key code 124 using {{}}
+                end tell
+                ''' if amount > 0 else f'''
+                tell application "System Events"
+                    tell process "Safari" to set frontmost to true
+                    key code 123 using {{}}
+                end tell
+                '''
+
+        import subprocess
+        subprocess.run(['osascript', '-e', script], capture_output=True)
+
+    def scroll_vector(self, vertical, horizontal):
+        if vertical:
+            self.scroll(vertical, "vertical")
+        if horizontal:
+            self.scroll(horizontal, "horizontal")
+
+
+class QuartzBackend:
+    """Pixel-precise scroll wheel events posted through Quartz, like a trackpad"""
+    name = "quartz"
+    resolution = 10  # Pixels per wheel line
+
+    def __init__(self):
+        self.quartz = None
+        self.lock = threading.Lock()
+
+    def warm_up(self):
+        with self.lock:
+            if self.quartz is None:
+                import Quartz  # pyobjc-framework-Quartz, already required by PyAutoGUI on macOS
+                self.quartz = Quartz
+        return self.quartz
+
+    def scroll(self, amount, direction):
+        q = self.quartz or self.warm_up()
+        if direction == "vertical":
+            event = q.CGEventCreateScrollWheelEvent(None, q.kCGScrollEventUnitPixel, 1, amount)
+        else:
+            event = q.CGEventCreateScrollWheelEvent(None, q.kCGScrollEventUnitPixel, 2, 0, amount)
+        q.CGEventPost(q.kCGHIDEventTap, event)
+
+    def scroll_vector(self, vertical, horizontal):
+        q = self.quartz or self.warm_up()
+        # Wheel 1 is vertical, wheel 2 horizontal: one event carries both
+        event = q.CGEventCreateScrollWheelEvent(None, q.kCGScrollEventUnitPixel, 2, vertical, horizontal)
+        q.CGEventPost(q.kCGHIDEventTap, event)
+
+
+class NullBackend:
+    """Discards scroll output while counting it; for benchmarks and dry runs"""
+    name = "null"
+
+    def __init__(self, resolution=1):
+        self.resolution = resolution
+        self.calls = 0
+        self.total = 0  # Vertical units
+        self.horizontal_total = 0
+
+    def warm_up(self):
+        pass
+
+    def scroll(self, amount, direction):
+        if direction == "vertical":
+            self.scroll_vector(amount, 0)
+        else:
+            self.scroll_vector(0, amount)
+
+    def scroll_vector(self, vertical, horizontal):
+        self.calls += 1
+        self.total += vertical
+        self.horizontal_total += horizontal
+
+
+SCROLL_BACKENDS = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    AppleScriptBackend.name: AppleScriptBackend,
+    QuartzBackend.name: QuartzBackend,
+    NullBackend.name: NullBackend,
+}
+
+
+def pyautogui_available():
+    """Whether PyAutoGUI is installed, without importing it"""
+    return importlib.util.find_spec("pyautogui") is not None
+
+
+def create_backend(name=None):
+    """Build a scroll backend by name, defaulting to the best one available"""
+    if name is None:
+        name = "pyautogui" if pyautogui_available() else "applescript"
+    if name not in SCROLL_BACKENDS:
+        raise ValueError(f"Unknown scroll backend '{name}' (choose from {', '.join(SCROLL_BACKENDS)})")
+    return SCROLL_BACKENDS[name]()
@@ -1,290 +1,354 @@
 #!/usr/bin/env python3
 import os
 import sys
-
-# Add virtual environment to path if it exists
-venv_path = os.path.join(os.path.dirname(__file__), 'venv', 'lib', 'python3.13', 'site-packages')
-if os.path.exists(venv_path):
-    sys.path.insert(0, venv_path)
 import socket
+import fcntl
+import termios
 import threading
 import json
 import time
 import math
+import re
+import secrets
+import signal
 from datetime import datetime
 
-# Try to import zeroconf for Bonjour service
-try:
-    from zeroconf import ServiceInfo, Zeroconf
-    import socket as sock
-    ZEROCONF_AVAILABLE = True
-    print("✅ Zeroconf available for Bonjour service")
-except ImportError:
-    ZEROCONF_AVAILABLE = False
-    print("⚠️  Zeroconf not available. Install with: pip install zeroconf")
+from discovery import ServiceAdvertiser
+from injector_process import InlineInjector
+from metrics import LatencyHistogram
+from profiling import ProfileCapture
+from scroll_backends import SCROLL_BACKENDS, NullBackend, create_backend
+
+# Minimal scroll acknowledgment, encoded once: s=status
+SCROLL_ACK = b'{"s":"ok"}\n'
+# Size of a minimal scroll frame ({"a":1,"p":950}\n), for turning unread bytes into frames
+SCROLL_FRAME_BYTES = 16
+# Bytes per recv(); also the slice size when a backlog read in one go is handled
+READ_SIZE = 1024
 
-# Try to import pyautogui for Mac scrolling
-try:
-    import pyautogui
-    # Disable PyAutoGUI's automatic pause for smoother scrolling
-    pyautogui.PAUSE = 0
-    pyautogui.MINIMUM_DURATION = 0
-    pyautogui.MINIMUM_SLEEP = 0
-    PYAUTOGUI_AVAILABLE = True
-    print("✅ PyAutoGUI available for Mac scrolling")
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
-    print("⚠️  PyAutoGUI not available. Install with: pip install pyautogui")
+# Status (a:2) and ping (a:3), minimal or legacy, recognised on raw bytes before decode
+CONTROL_FRAME = re.compile(rb'"a"\s*:\s*[23]\s*[,}]|"action"\s*:\s*"(?:ping|requestStatus)"')
+CONTROL_ACTIONS = (2, 3, "ping", "requestStatus")
+# Scroll (a:1) and scroll batch (a:5): the only frames a control frame may overtake
+SCROLL_FRAME = re.compile(rb'"a"\s*:\s*[15]\s*[,}]|"action"\s*:\s*"(?:scroll|scrollBatch)"')
 
-# Try alternative using AppleScript
-import subprocess
 
-# Try to import requests for Supabase IP registration
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-    print("✅ Requests available for IP registration")
-except ImportError:
-    REQUESTS_AVAILABLE = False
-    print("⚠️  Requests not available. Install with: pip install requests")
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `burst`; take() spends tokens if there are enough"""
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+    
+    def take(self, amount=1):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < amount:
+            return False
+        self.tokens -= amount
+        return True
+
+
+class AxisState:
+    """Scroll physics state for one axis"""
+    def __init__(self):
+        self.scroll_accumulator = 0.0  # Sub-unit scroll remainder carried between deltas (backend units)
+        self.last_scroll_time = 0
+        self.last_direction = 0  # Track last scroll direction
+        self.momentum = 0  # Current momentum value
+        self.scroll_history = []  # Recent scroll values for smoothing
+
+
+class ScrollSession:
+    """Per-bridge scroll state that outlives a single TCP connection.
+
+    Holds the physics state and the last applied sequence number so that a
+    bridge reconnecting with its resume token picks up where it left off.
+    """
+    def __init__(self):
+        self.token = secrets.token_hex(8)
+        self.vertical = AxisState()
+        self.horizontal = AxisState()
+        self.last_scroll_time = 0  # Event time of the latest applied delta on either axis
+        self.last_seq = -1  # Highest scroll sequence number applied
+        self.connected_at = time.time()
+        self.first_scroll_logged = False
+        self.resumed = False
+        self.clock_offset = None  # Server monotonic clock minus sender clock (incl. min one-way delay)
+        self.clock_offset_at = 0  # Server monotonic time of the last offset sample
+        self.received_ns = None  # monotonic_ns when the frame being handled was read
+        self.buffered_bytes = 0  # Read from the socket but not yet handled (backlog slices to go)
+        # Flow control (only for bridges that list "fc" in their capabilities)
+        self.flow_control = False
+        self.rtt_ms = None  # Smoothed RTT reported by the bridge in pings ("r")
+        self.last_frame_at = 0
+        self.advertised = None  # (interval_ms, batch) last sent to the bridge
+        self.advertised_at = 0
+        self.stale_dropped = 0
+        self.detached_at = None  # Set while no connection owns the session
+        # Admission control (set by the server for sessions that own a connection)
+        self.frame_bucket = None  # Frames/sec, checked before decode
+        self.control_bucket = None  # Ping/status per second on the priority lane
+        self.displacement_bucket = None  # |pixels|/sec over both axes, checked per delta
+        self.shed_frames = 0
+        self.shed_pixels = 0
+        self.throttle_logged_at = 0
+        self.throttle_logged_frames = 0
+        self.throttle_logged_pixels = 0
+
 
 class WatchScrollerServer:
-    def __init__(self, host='0.0.0.0', port=8888):
+    def __init__(self, host='0.0.0.0', port=8888, session_grace_period=30.0, stale_deadline=0.25,
+                 backend=None, injector="inline", advertise=True, backlog=128, reuse_port=False,
+                 log_prefix="", scroll_unit=120.0, unix_socket=None, unix_socket_mode=0o600,
+                 max_clients=64, frame_rate_limit=240.0, displacement_rate_limit=600000.0,
+                 control_lane=True, control_rate_limit=20.0):
         self.host = host
         self.port = port
+        self.unix_socket = unix_socket  # Optional AF_UNIX path for same-host producers
+        self.unix_socket_mode = unix_socket_mode  # Filesystem permissions are its access control
+        self.unix_server_socket = None
+        self.log_prefix = log_prefix  # e.g. "[w2] " in multi-worker mode
+        self.backlog = backlog  # Room for SYNs from a reconnect storm
+        self.reuse_port = reuse_port  # SO_REUSEPORT so sibling workers can bind the same port
+        self.advertise = advertise  # Bonjour + Supabase registration
+        self.ready = threading.Event()  # Set once the listening socket is up
+        self.backend = backend if backend is not None else create_backend()
+        if injector == "process":
+            from injector_process import ProcessInjector
+            # The child builds its own backend of the same kind
+            self.injector = ProcessInjector(self.backend.name, self.log, self.backend.resolution)
+        elif injector == "inline":
+            self.injector = InlineInjector(self.backend)
+        else:
+            self.injector = injector  # Already wired up, e.g. a worker's RingInjector
         self.server_socket = None
         self.running = False
         self.clients = []
-        self.scroll_accumulator = 0  # Accumulate small scroll amounts
-        self.last_scroll_time = 0
-        self.last_direction = 0  # Track last scroll direction
-        self.momentum = 0  # Current momentum value
+        self.clients_lock = threading.Lock()  # Client threads add/remove while stop() closes them
         self.momentum_decay = 0.85  # Faster momentum decay to reduce stickiness
-        self.scroll_history = []  # Recent scroll values for smoothing
         self.max_history = 3  # Reduce history for more responsive scrolling
-        self.zeroconf = None
-        self.service_info = None
+        self.stale_deadline = stale_deadline  # Seconds after which a batched delta is dropped, not replayed
+        self.clock_offset_slew = 0.5  # Seconds per second the clock offset estimate may rise between samples
+        self.scroll_unit = scroll_unit  # Physics pixels per wheel line
+        
+        # Send-rate advice for flow-control capable bridges
+        self.base_send_interval_ms = 16  # Matches the bridge's 60 FPS relay
+        self.idle_send_interval_ms = 250  # Suggested once the user stops scrolling
+        self.idle_after = 2.0  # Seconds without scroll frames before a session counts as idle
+        self.max_batch = 8
+        self.flow_control_min_period = 1.0  # Seconds between adverts to one bridge
+        
+        # Admission control ahead of the injector (None disables a limit)
+        self.max_clients = max_clients
+        self.frame_rate_limit = frame_rate_limit  # Frames/sec per connection; the bridge sends ~60
+        self.frame_burst = frame_rate_limit / 2 if frame_rate_limit else None
+        self.displacement_rate_limit = displacement_rate_limit  # |pixels|/sec per connection
+        self.displacement_burst = displacement_rate_limit / 4 if displacement_rate_limit else None
+        self.throttle_log_period = 5.0  # Seconds between throttle log lines per connection
+        self.rejected_connections = 0
+        self.shed_frames = 0
+        self.shed_pixels = 0
+        self.reject_logged_at = 0
+        
+        # Priority lane: ping/status are answered ahead of queued scroll work
+        self.control_lane = control_lane
+        self.max_read_bytes = 65536  # Most bytes pulled in at once to find control frames behind a backlog
+        self.control_rate_limit = control_rate_limit  # Ping/status per second per connection on the lane
+        self.control_burst = control_rate_limit / 2 if control_rate_limit else None
+        self.control_latency = LatencyHistogram()  # Receipt to reply for ping/status
+        self.advertiser = None  # Bonjour/Supabase registration, set up once listening
+        
+        # Session resumption: token -> ScrollSession, kept for a grace period after disconnect
+        self.sessions = {}
+        self.connection_sessions = {}  # client_socket -> ScrollSession
+        self.sessions_lock = threading.Lock()
+        self.session_grace_period = session_grace_period
+        self.default_session = ScrollSession()  # Used when scrolling without a connection
         
-        # Supabase IP registration
-        self.supabase_url = "https://qeioxayacjcrbxbuqzef.functions.supabase.co"
-        self.uuid = "zaynjarvis"
+        # On-demand profiling (SIGUSR1 / SIGUSR2 or a loopback "profile" action)
+        self.profiler = ProfileCapture(self.log, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profiles'))
         
     def log(self, message):
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"{timestamp} {message}")
+        print(f"{timestamp} {self.log_prefix}{message}")
     
-    def register_bonjour_service(self):
-        """Register Bonjour/mDNS service for auto-discovery"""
-        if not ZEROCONF_AVAILABLE:
-            self.log("⚠️  Zeroconf not available, skipping Bonjour registration")
-            return
-        
-        try:
-            # Get all available IP addresses
-            local_ips = self.get_all_local_ips()
-            hostname = socket.gethostname()
-            
-            self.log(f"📍 Available IPs: {local_ips}")
-            
-            # Create service info with all available IP addresses
-            service_name = "WatchScroller._watchscroller._tcp.local."
-            addresses = [socket.inet_aton(ip) for ip in local_ips if ip != "127.0.0.1"]
-            
-            if not addresses:
-                self.log("❌ No valid IP addresses found for Bonjour")
-                return
-                
-            self.service_info = ServiceInfo(
-                "_watchscroller._tcp.local.",
-                service_name,
-                addresses=addresses,
-                port=self.port,
-                properties={
-                    'version': '1.0',
-                    'platform': 'mac',
-                    'hostname': hostname,
-                    'primary_ip': local_ips[0] if local_ips else 'unknown'
-                }
-            )
-            
-            # Register service on all interfaces
-            self.zeroconf = Zeroconf()
-            self.zeroconf.register_service(self.service_info)
-            self.log(f"📡 Bonjour service registered: {service_name}")
-            self.log(f"📍 Broadcasting on IPs: {local_ips} port {self.port}")
-            self.log(f"📍 Interfaces: {[name for idx, name in socket.if_nameindex()]}")
-            
-        except Exception as e:
-            self.log(f"❌ Failed to register Bonjour service: {e}")
-            import traceback
-            self.log(f"Stack trace: {traceback.format_exc()}")
-    
-    def register_ip_with_supabase(self):
-        """Register IP address with Supabase for fallback service discovery"""
-        if not REQUESTS_AVAILABLE:
-            self.log("⚠️  Requests not available, skipping Supabase IP registration")
-            return
-        
+    def start(self):
         try:
-            # Get the primary local IP address
-            primary_ip = self.get_local_ip()
-            if not primary_ip or primary_ip == "127.0.0.1":
-                self.log("❌ No valid IP address found for Supabase registration")
-                return
+            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             
-            # Prepare registration data
-            registration_data = {
-                "uuid": self.uuid,
-                "ip": primary_ip
-            }
+            self.log(f"🚀 Starting TCP server on {self.host}:{self.port}")
+            self.server_socket.bind((self.host, self.port))
+            self.server_socket.listen(self.backlog)
+            self.port = self.server_socket.getsockname()[1]  # Resolve port 0 to the real one
+            self.running = True
+            self.install_profiling_signals()
             
-            # Make POST request to register IP
-            url = f"{self.supabase_url}/set-ip"
-            headers = {"Content-Type": "application/json"}
+            self.log(f"🎉 Server listening on {self.host}:{self.port}")
+            if self.unix_socket:
+                self.unix_server_socket = self.listen_unix_socket()
+                threading.Thread(target=self.accept_loop, args=(self.unix_server_socket,),
+                                 name="unix-accept", daemon=True).start()
+            self.ready.set()
             
-            self.log(f"🌐 Registering IP with Supabase: {primary_ip}")
-            response = requests.post(url, json=registration_data, headers=headers, timeout=10)
+            # Slow setup (backend libraries, mDNS, HTTP) runs after the listener is up
+            threading.Thread(target=self.warm_up, daemon=True).start()
+            self.log(f"📊 Waiting for connections...")
             
-            if response.status_code == 200:
-                self.log(f"✅ Successfully registered IP {primary_ip} with Supabase")
-            else:
-                self.log(f"❌ Failed to register IP with Supabase: HTTP {response.status_code}")
-                self.log(f"Response: {response.text}")
-                
-        except requests.exceptions.RequestException as e:
-            self.log(f"❌ Network error registering IP with Supabase: {e}")
+            self.accept_loop(self.server_socket)
+                        
         except Exception as e:
-            self.log(f"❌ Failed to register IP with Supabase: {e}")
-            import traceback
-            self.log(f"Stack trace: {traceback.format_exc()}")
+            self.log(f"❌ Failed to start server: {e}")
+            self.running = False
+            if self.server_socket:
+                self.server_socket.close()
     
-    def get_local_ip(self):
-        """Get local IP address more reliably"""
+    def listen_unix_socket(self):
+        """Bind the AF_UNIX listener; only users allowed by unix_socket_mode can connect"""
+        import errno
+        import stat
+        import tempfile
         try:
-            # Method 1: Connect to external server to get local IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            return local_ip
-        except:
+            mode = os.lstat(self.unix_socket).st_mode
+        except FileNotFoundError:
+            mode = None
+        if mode is not None and not stat.S_ISSOCK(mode):
+            raise OSError(errno.EEXIST, "Unix socket path exists and is not a socket", self.unix_socket)
+        if mode is not None:
+            # Only a socket nobody is listening on was left behind by a server that did not stop cleanly
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            probe.settimeout(1.0)
             try:
-                # Method 2: Try hostname resolution
-                hostname = socket.gethostname()
-                return socket.gethostbyname(hostname)
-            except:
-                # Method 3: Fallback to localhost
-                return "127.0.0.1"
-                
-    def get_all_local_ips(self):
-        """Get all local IP addresses for Bonjour registration"""
-        import subprocess
-        ips = []
+                probe.connect(self.unix_socket)
+            except ConnectionRefusedError:
+                os.unlink(self.unix_socket)
+            except FileNotFoundError:
+                pass
+            else:
+                raise OSError(errno.EADDRINUSE, "Unix socket is in use by a running server", self.unix_socket)
+            finally:
+                probe.close()
         
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # Bind inside a private (0700) directory, set the final permissions, then link the node
+        # into place, so it is never reachable with wider ones and the process umask is untouched.
+        # link() fails rather than replace whatever appeared at the path since the check above
+        staging_dir = tempfile.mkdtemp(prefix='.ws', dir=os.path.dirname(os.path.abspath(self.unix_socket)))
+        staging = os.path.join(staging_dir, 's')
         try:
-            # Use ifconfig to get all IPs
-            result = subprocess.run(['ifconfig'], capture_output=True, text=True)
-            for line in result.stdout.split('\n'):
-                if 'inet ' in line and '127.0.0.1' not in line:
-                    # Extract IP address
-                    parts = line.strip().split()
-                    for i, part in enumerate(parts):
-                        if part == 'inet' and i + 1 < len(parts):
-                            ip = parts[i + 1]
-                            if self.is_valid_ip(ip) and ip not in ips:
-                                ips.append(ip)
-        except:
-            self.log("⚠️ Could not get interface IPs, using primary IP")
-        
-        # Get primary IP as fallback
-        primary_ip = self.get_local_ip()
-        if primary_ip and primary_ip != "127.0.0.1" and primary_ip not in ips:
-            ips.insert(0, primary_ip)  # Put primary IP first
-            
-        # Ensure we have at least one IP
-        if not ips:
-            ips.append("127.0.0.1")
-            
-        return ips
-    
-    def is_valid_ip(self, ip):
-        """Check if IP address is valid"""
-        try:
-            parts = ip.split('.')
-            return len(parts) == 4 and all(0 <= int(part) <= 255 for part in parts)
-        except:
-            return False
+            listener.bind(staging)
+            os.chmod(staging, self.unix_socket_mode)
+            os.link(staging, self.unix_socket)
+        except OSError:
+            listener.close()
+            raise
+        finally:
+            if os.path.exists(staging):
+                os.unlink(staging)
+            os.rmdir(staging_dir)
+        listener.listen(self.backlog)
+        self.log(f"🎉 Server listening on unix:{self.unix_socket} (mode {self.unix_socket_mode:o})")
+        return listener
     
-    def unregister_bonjour_service(self):
-        """Unregister Bonjour/mDNS service"""
-        if self.zeroconf and self.service_info:
+    def accept_loop(self, listener):
+        while self.running:
             try:
-                self.zeroconf.unregister_service(self.service_info)
-                self.zeroconf.close()
-                self.log("📡 Bonjour service unregistered")
+                client_socket, client_address = listener.accept()
+                if listener.family == socket.AF_UNIX:
+                    client_address = f"unix:{self.unix_socket}"  # Peers are unnamed
+                else:
+                    # Small replies must not wait for the peer's delayed ACK behind earlier acks
+                    client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if not self.admit_client(client_socket):
+                    self.reject_client(client_socket, client_address)
+                    continue
+                self.log(f"✅ New connection from {client_address}")
+                
+                # Handle client in separate thread
+                client_thread = threading.Thread(
+                    target=self.handle_client,
+                    args=(client_socket, client_address)
+                )
+                client_thread.daemon = True
+                client_thread.start()
+                
             except Exception as e:
-                self.log(f"❌ Failed to unregister Bonjour service: {e}")
-        
-    def start(self):
-        try:
-            self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            
-            self.log(f"🚀 Starting TCP server on {self.host}:{self.port}")
-            self.server_socket.bind((self.host, self.port))
-            self.server_socket.listen(5)
-            self.running = True
+                if self.running:
+                    self.log(f"❌ Error accepting connection: {e}")
             
+    def warm_up(self):
+        """Load the scroll backend and register discovery without delaying the first accept"""
+        warm_up = getattr(self.injector, 'warm_up', None)
+        if warm_up is not None:
+            try:
+                warm_up()
+                self.log(f"🖱️  Scroll backend ready: {self.backend.name}")
+            except ImportError as e:
+                self.log(f"⚠️  Scroll backend {self.backend.name} unavailable: {e}")
+        
+        if self.advertise and self.running:
+            self.advertiser = ServiceAdvertiser(self.port, self.log)
             # Register Bonjour service for auto-discovery
-            self.register_bonjour_service()
+            self.advertiser.register_bonjour_service()
             
             # Register IP with Supabase for fallback service discovery
-            self.register_ip_with_supabase()
-            
-            self.log(f"🎉 Server listening on {self.host}:{self.port}")
-            self.log(f"📊 Waiting for connections...")
-            
-            while self.running:
-                try:
-                    client_socket, client_address = self.server_socket.accept()
-                    self.log(f"✅ New connection from {client_address}")
-                    
-                    # Handle client in separate thread
-                    client_thread = threading.Thread(
-                        target=self.handle_client,
-                        args=(client_socket, client_address)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                    
-                except Exception as e:
-                    if self.running:
-                        self.log(f"❌ Error accepting connection: {e}")
-                        
-        except Exception as e:
-            self.log(f"❌ Failed to start server: {e}")
-            
+            self.advertiser.register_ip_with_supabase()
+            if not self.running:  # stop() ran while we were registering
+                self.advertiser.unregister_bonjour_service()
+    
+    def admit_client(self, client_socket):
+        """Register the connection unless max_clients are already connected"""
+        with self.clients_lock:
+            if self.max_clients and len(self.clients) >= self.max_clients:
+                return False
+            self.clients.append(client_socket)
+            return True
+    
+    def reject_client(self, client_socket, client_address):
+        self.rejected_connections += 1
+        try:
+            client_socket.close()
+        except OSError:
+            pass
+        now = time.time()
+        if now - self.reject_logged_at >= self.throttle_log_period:
+            self.reject_logged_at = now
+            self.log(f"🚦 Rejected connection from {client_address}: {self.max_clients} clients connected "
+                     f"({self.rejected_connections} rejected so far)")
+    
     def handle_client(self, client_socket, client_address):
-        self.clients.append(client_socket)
+        self.open_session(client_socket)
         self.log(f"👋 Client {client_address} connected, total clients: {len(self.clients)}")
+        partial = b''  # Start of a frame cut off by the previous read
         
         try:
             while self.running:
                 try:
                     # Receive data
-                    data = client_socket.recv(1024)
+                    data = client_socket.recv(READ_SIZE)
                     if not data:
                         break
-                        
-                    # Try to parse as JSON (handle multiple newline-delimited messages)
-                    try:
-                        message_str = data.decode('utf-8')
-                        
-                        # Split messages by newline delimiter first, then handle any remaining concatenated messages
-                        self.parse_and_handle_messages(message_str, client_socket, client_address)
-                        
-                    except UnicodeDecodeError as e:
-                        self.log(f"⚠️  Unicode decode error from {client_address}: {e}")
+                    if self.control_lane and len(data) == READ_SIZE:
+                        # A full read means more is queued; take it too so control frames in it go first
+                        data += self.read_queued(client_socket)
+                    if partial:
+                        data = partial + data
+                        partial = b''
+                    if data[-1:] != b'\n':
+                        data, partial = self.split_partial_frame(data)
+                        if not data:
+                            continue
+                    
+                    handler = self.handle_data if len(data) <= READ_SIZE else self.handle_backlog
+                    if self.profiler.active:
+                        self.profiler.profile_call(handler, data, client_socket, client_address)
+                    else:
+                        handler(data, client_socket, client_address)
                         
                 except socket.timeout:
                     continue
@@ -295,11 +359,192 @@ class WatchScrollerServer:
         except Exception as e:
             self.log(f"❌ Client handler error for {client_address}: {e}")
         finally:
-            if client_socket in self.clients:
-                self.clients.remove(client_socket)
+            with self.clients_lock:
+                if client_socket in self.clients:
+                    self.clients.remove(client_socket)
+            self.detach_session(client_socket)
             client_socket.close()
             self.log(f"👋 Client {client_address} disconnected, remaining clients: {len(self.clients)}")
     
+    def read_queued(self, client_socket):
+        """Whatever is already readable on the connection (at most max_read_bytes), without blocking"""
+        available = min(self.readable_bytes(client_socket), self.max_read_bytes)
+        return client_socket.recv(available) if available else b''
+    
+    def split_partial_frame(self, data):
+        """(complete, partial): hold back a trailing frame that the read boundary cut in two
+        
+        Data ending in "}" is complete, which keeps concatenated frames without
+        newlines working. A partial frame larger than max_read_bytes is dropped.
+        """
+        if data.rstrip().endswith(b'}'):
+            return data, b''
+        cut = data.rfind(b'\n') + 1
+        partial = data[cut:]
+        return data[:cut], partial if len(partial) <= self.max_read_bytes else b''
+    
+    def handle_backlog(self, data, client_socket, client_address):
+        """Handle more than one read of frames: control frames anywhere in it first, then
+        the rest through handle_data in read-sized slices, so the frame limiter sees reads
+        of the usual size
+        """
+        session = self.get_session(client_socket)
+        session.received_ns = time.monotonic_ns()
+        if self.control_lane and CONTROL_FRAME.search(data):
+            data = self.handle_control_frames(data, session, client_socket, client_address)
+            if not data.strip():
+                return
+        start = 0
+        while start < len(data):
+            end = data.rfind(b'\n', start, start + READ_SIZE) + 1
+            if end <= start:
+                end = len(data)  # No newline in reach (e.g. concatenated frames): the rest in one go
+            # Slices still to go count as unread backlog in the send-rate advice
+            self.get_session(client_socket).buffered_bytes = len(data) - end
+            self.handle_data(data[start:end], client_socket, client_address)
+            start = end
+        self.get_session(client_socket).buffered_bytes = 0
+    
+    def handle_data(self, data, client_socket, client_address):
+        session = self.get_session(client_socket)
+        session.received_ns = time.monotonic_ns()
+        # Priority lane: ping/status go before the scroll frames that arrived with them,
+        # under their own small budget instead of the frame limiter below
+        if self.control_lane and CONTROL_FRAME.search(data):
+            data = self.handle_control_frames(data, session, client_socket, client_address)
+            if not data.strip():
+                return
+        # Shed a flood before paying for decode: one token per frame. Count opening braces, not
+        # newlines, since concatenated frames without newlines are parsed too
+        if session.frame_bucket is not None:
+            frames = data.count(b'{') or 1
+            if not session.frame_bucket.take(frames):
+                session.shed_frames += frames
+                self.shed_frames += frames
+                self.log_throttle(session, client_address)
+                return
+        # Try to parse as JSON (handle multiple newline-delimited messages)
+        try:
+            message_str = data.decode('utf-8')
+            
+            # Split messages by newline delimiter first, then handle any remaining concatenated messages
+            self.parse_and_handle_messages(message_str, client_socket, client_address)
+            
+        except UnicodeDecodeError as e:
+            self.log(f"⚠️  Unicode decode error from {client_address}: {e}")
+    
+    def handle_control_frames(self, data, session, client_socket, client_address):
+        """Answer ping/status lines that only have scroll frames ahead of them; returns the bytes left
+        
+        Control frames overtake scroll frames (a:1, a:5) and nothing else: from the first
+        other frame on (e.g. a resume, whose reply must come before a status carrying the
+        token), the rest of the data is left in arrival order for the regular parser.
+        """
+        lines = data.split(b'\n')
+        scroll = []
+        for index, line in enumerate(lines):
+            if CONTROL_FRAME.search(line):
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    message = None  # e.g. concatenated frames; the regular parser splits them
+                if isinstance(message, dict) and message.get('a', message.get('action')) in CONTROL_ACTIONS:
+                    if session.control_bucket is None or session.control_bucket.take():
+                        self.handle_message(message, client_socket, client_address)
+                    else:
+                        session.shed_frames += 1
+                        self.shed_frames += 1
+                        self.log_throttle(session, client_address)
+                    continue
+            elif SCROLL_FRAME.search(line) or not line.strip():
+                scroll.append(line)
+                continue
+            return b'\n'.join(scroll + lines[index:])
+        return b'\n'.join(scroll)
+    
+    def admit_displacement(self, session, vertical, horizontal, client_address):
+        """Spend displacement tokens for one delta; False when it has to be shed"""
+        bucket = session.displacement_bucket
+        if bucket is None:
+            return True
+        try:
+            pixels = abs(vertical) + abs(horizontal)
+        except TypeError:
+            return True  # Malformed; the physics rejects it
+        if bucket.take(pixels):
+            return True
+        session.shed_pixels += pixels
+        self.shed_pixels += pixels
+        self.log_throttle(session, client_address)
+        return False
+    
+    def log_throttle(self, session, client_address):
+        """At most one line per throttle_log_period per connection"""
+        now = time.time()
+        if now - session.throttle_logged_at < self.throttle_log_period:
+            return
+        frames = session.shed_frames - session.throttle_logged_frames
+        pixels = session.shed_pixels - session.throttle_logged_pixels
+        session.throttle_logged_at = now
+        session.throttle_logged_frames = session.shed_frames
+        session.throttle_logged_pixels = session.shed_pixels
+        self.log(f"🚦 Throttling {client_address}: shed {frames} frames and {pixels:.0f} px "
+                 f"(totals {session.shed_frames} frames, {session.shed_pixels:.0f} px)")
+    
+    def install_profiling_signals(self):
+        """SIGUSR1 starts a sampling capture, SIGUSR2 a cProfile capture"""
+        if threading.current_thread() is not threading.main_thread() or not hasattr(signal, 'SIGUSR1'):
+            return
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.start_profiling(mode="sample"))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self.start_profiling(mode="cprofile"))
+        self.log(f"🔬 Profiling: kill -USR1 {os.getpid()} (sampler) or -USR2 (cProfile)")
+    
+    def start_profiling(self, seconds=10.0, mode="sample", trace_memory=True):
+        if not self.profiler.start(seconds, mode, trace_memory):
+            self.log("⚠️  Profiling already in progress")
+            return False
+        return True
+    
+    def new_session(self):
+        """A session with this server's per-connection admission limits"""
+        session = ScrollSession()
+        if self.frame_rate_limit:
+            session.frame_bucket = TokenBucket(self.frame_rate_limit, self.frame_burst)
+        if self.displacement_rate_limit:
+            session.displacement_bucket = TokenBucket(self.displacement_rate_limit, self.displacement_burst)
+        if self.control_rate_limit:
+            session.control_bucket = TokenBucket(self.control_rate_limit, self.control_burst)
+        return session
+    
+    def open_session(self, client_socket):
+        """Give a new connection a fresh session; a resume request may replace it"""
+        session = self.new_session()
+        with self.sessions_lock:
+            self.prune_sessions()
+            self.sessions[session.token] = session
+            self.connection_sessions[client_socket] = session
+        return session
+    
+    def detach_session(self, client_socket):
+        """Keep the connection's session around for the grace period"""
+        with self.sessions_lock:
+            session = self.connection_sessions.pop(client_socket, None)
+            if session is not None:
+                session.detached_at = time.time()
+    
+    def prune_sessions(self):
+        """Drop detached sessions whose grace period has expired (caller holds sessions_lock)"""
+        now = time.time()
+        expired = [token for token, session in self.sessions.items()
+                   if session.detached_at is not None
+                   and now - session.detached_at > self.session_grace_period]
+        for token in expired:
+            del self.sessions[token]
+    
+    def get_session(self, client_socket):
+        session = self.connection_sessions.get(client_socket)
+        return session if session is not None else self.default_session
+    
     def parse_and_handle_messages(self, message_str, client_socket, client_address):
         """Parse multiple newline-delimited and/or concatenated JSON messages"""
         
@@ -377,6 +622,14 @@ class WatchScrollerServer:
             self.handle_request_status(message, client_socket, client_address)
         elif action == 3 or action == "ping":
             self.handle_ping(message, client_socket, client_address)
+        elif action == 4 or action == "resume":
+            self.handle_resume(message, client_socket, client_address)
+        elif action == 5 or action == "scrollBatch":
+            self.handle_scroll_batch(message, client_socket, client_address)
+        elif action == 6 or action == "stats":
+            self.handle_stats(message, client_socket, client_address)
+        elif action == "profile":
+            self.handle_profile(message, client_socket, client_address)
         elif action == "setActive":
             self.handle_set_active(message, client_socket, client_address)
         elif action == "setSensitivity":
@@ -386,32 +639,241 @@ class WatchScrollerServer:
             
     def handle_scroll_minimal(self, message, client_socket, client_address):
         """Handle ultra-minimal scroll messages for maximum performance"""
-        # Get pixels from minimal format "p" or legacy "pixels"
+        # Get pixels from minimal format "p" or legacy "pixels"; "h" is the optional horizontal axis
         pixels = message.get('p', message.get('pixels', 0))
-        direction = "vertical"  # Always vertical for simplicity
+        horizontal = message.get('h', 0)
+        session = self.get_session(client_socket)
         
-        # Silent scrolling for performance
+        if (self.accept_scroll_frame(message, session, client_address)
+                and self.admit_displacement(session, pixels, horizontal, client_address)):
+            # Silent scrolling for performance
+            
+            # Actually perform the scroll on Mac
+            # "x":1 marks a probe frame: full physics and ack, no OS scroll
+            self.perform_scroll_vector(pixels, horizontal, session, inject=not message.get('x'))
         
-        # Actually perform the scroll on Mac
-        self.perform_mac_scroll(pixels, direction)
+        self.send_scroll_ack(client_socket, client_address)
+        if session.flow_control:
+            self.advertise_send_rate(session, client_socket, client_address)
+    
+    def handle_scroll_batch(self, message, client_socket, client_address):
+        """Handle a batch frame: {"a":5,"t":send_time,"b":[[pixels,offset_ms(,horizontal)],...]}
+        
+        "t" is the sender's clock (seconds) when the frame was written and each
+        offset (usually <= 0) places a delta relative to it, so physics runs on
+        when the user turned the crown rather than when packets happened to arrive.
+        """
+        session = self.get_session(client_socket)
+        deltas = message.get('b')
+        sender_time = message.get('t')
+        if (not isinstance(deltas, list) or not isinstance(sender_time, (int, float))
+                or not math.isfinite(sender_time)):
+            self.log(f"⚠️  Malformed scroll batch from {client_address}")
+            self.send_scroll_ack(client_socket, client_address)
+            return
+        
+        if self.accept_scroll_frame(message, session, client_address):
+            arrival_time = time.monotonic()
+            # Smallest recent (arrival - send) approximates the clock offset plus the minimum
+            # one-way delay, mapping sender timestamps onto the server's monotonic clock. The
+            # minimum may rise slowly between samples, so a sender clock stepping back (or
+            # running slow) only drops deltas until the estimate catches up
+            sample = arrival_time - sender_time
+            if session.clock_offset is None:
+                session.clock_offset = sample
+            else:
+                allowed = session.clock_offset + (arrival_time - session.clock_offset_at) * self.clock_offset_slew
+                session.clock_offset = min(sample, allowed)
+            session.clock_offset_at = arrival_time
+            
+            dropped = 0
+            for delta in deltas:
+                # [pixels, offset_ms] or [pixels, offset_ms, horizontal], all finite numbers
+                if not (isinstance(delta, list) and 2 <= len(delta) <= 3
+                        and all(isinstance(value, (int, float)) and math.isfinite(value) for value in delta)):
+                    continue
+                pixels, offset_ms = delta[0], delta[1]
+                horizontal = delta[2] if len(delta) > 2 else 0
+                event_time = sender_time + offset_ms / 1000.0 + session.clock_offset
+                if arrival_time - event_time > self.stale_deadline:
+                    dropped += 1
+                    continue
+                if not self.admit_displacement(session, pixels, horizontal, client_address):
+                    continue
+                # Never let physics time run backwards on reordered deltas
+                event_time = max(event_time, session.last_scroll_time)
+                self.perform_scroll_vector(pixels, horizontal, session, event_time)
+            
+            if dropped:
+                session.stale_dropped += dropped
+                self.log(f"⌛ Dropped {dropped} stale deltas from {client_address} "
+                         f"(older than {self.stale_deadline * 1000:.0f}ms)")
+        
+        self.send_scroll_ack(client_socket, client_address)
+        if session.flow_control:
+            self.advertise_send_rate(session, client_socket, client_address)
+    
+    def accept_scroll_frame(self, message, session, client_address):
+        """Apply the frame's optional "q" sequence number; False for a replayed duplicate"""
+        # Frames replayed after a resume are acked but not re-applied
+        seq = message.get('q')
+        if isinstance(seq, int):  # Anything else is treated as an unsequenced frame
+            if seq <= session.last_seq:
+                return False
+            session.last_seq = seq
+        
+        session.last_frame_at = time.time()
+        
+        if not session.first_scroll_logged:
+            session.first_scroll_logged = True
+            elapsed_ms = (time.time() - session.connected_at) * 1000
+            kind = "resumed" if session.resumed else "fresh"
+            self.log(f"⏱️  First scroll from {client_address} {elapsed_ms:.1f}ms after connect ({kind} session)")
+        return True
+    
+    def note_capabilities(self, message, session):
+        """Record optional client capabilities ("c": ["fc", ...]) and reported RTT ("r", ms)"""
+        capabilities = message.get('c')
+        if isinstance(capabilities, list) and 'fc' in capabilities:
+            session.flow_control = True
+        rtt = message.get('r')
+        if isinstance(rtt, (int, float)) and rtt >= 0:
+            session.rtt_ms = rtt if session.rtt_ms is None else session.rtt_ms * 0.8 + rtt * 0.2
+    
+    def readable_bytes(self, client_socket):
+        """Bytes waiting in the connection's receive buffer"""
+        try:
+            unread = fcntl.ioctl(client_socket.fileno(), termios.FIONREAD, b'\0\0\0\0')
+        except (OSError, ValueError, AttributeError):
+            return 0
+        return int.from_bytes(unread, sys.byteorder)
+    
+    def unread_frames(self, client_socket, session):
+        """Scroll frames (estimated) not handled yet: in the receive buffer or read but still queued"""
+        return (self.readable_bytes(client_socket) + session.buffered_bytes) // SCROLL_FRAME_BYTES
+    
+    def preferred_send_rate(self, session, client_socket=None):
+        """Suggested (interval_ms, batch) from the scroll backlog, RTT and recent activity
         
+        The backlog is the injector's queue plus frames still unread on the
+        connection. Inline injection has no queue, so there a backlog shows
+        up only as unread frames.
+        """
+        if time.time() - session.last_frame_at > self.idle_after:
+            return self.idle_send_interval_ms, 1
+        
+        interval = self.base_send_interval_ms
+        depth = self.injector.queue_depth()
+        if client_socket is not None:
+            depth += self.unread_frames(client_socket, session)
+        if depth > 64:
+            interval = 100
+        elif depth > 16:
+            interval = 50
+        
+        # Fold everything produced within one round trip into a single batch frame
+        batch = 1
+        if session.rtt_ms:
+            batch = max(1, min(self.max_batch, round(session.rtt_ms / interval)))
+        if depth > 16:
+            batch = self.max_batch
+        return interval, batch
+    
+    def advertise_send_rate(self, session, client_socket, client_address):
+        """Send {"s":"fc","i":interval_ms,"b":batch} when the advice changes (rate limited)"""
+        now = time.time()
+        if now - session.advertised_at < self.flow_control_min_period:
+            return
+        rate = self.preferred_send_rate(session, client_socket)
+        if rate == session.advertised:
+            return
+        session.advertised = rate
+        session.advertised_at = now
+        try:
+            client_socket.send(b'{"s":"fc","i":%d,"b":%d}\n' % rate)
+        except Exception as e:
+            self.log(f"❌ Failed to send flow control to {client_address}: {e}")
+    
+    def send_scroll_ack(self, client_socket, client_address):
         # Send minimal acknowledgment to keep connection alive
         # Ultra-minimal response: just "ok" to confirm receipt
         try:
-            ack_response = '{"s":"ok"}\n'.encode('utf-8')  # s=status, minimal format
-            client_socket.send(ack_response)
+            client_socket.send(SCROLL_ACK)
         except Exception as e:
             self.log(f"❌ Failed to send scroll ack to {client_address}: {e}")
             
     def handle_ping(self, message, client_socket, client_address):
-        self.log(f"🏓 Ping received from {client_address}")
+        # Pings arrive every few seconds per bridge and are answered silently
+        session = self.get_session(client_socket)
+        self.note_capabilities(message, session)
         response = {
             "action": "pong",
             "timestamp": time.time(),
             "server_time": datetime.now().isoformat()
         }
-        self.send_response(response, client_socket, client_address)
+        self.send_response(response, client_socket, client_address, quiet=True)
+        self.record_control_latency(session)
+        if session.flow_control:
+            self.advertise_send_rate(session, client_socket, client_address)
+    
+    def record_control_latency(self, session):
+        if session.received_ns is not None:
+            self.control_latency.record_ns(time.monotonic_ns() - session.received_ns)
+        
+    def handle_resume(self, message, client_socket, client_address):
+        """Reattach a reconnecting bridge to its previous session via resume token "k"."""
+        token = message.get('k', message.get('token'))
+        if not isinstance(token, str):
+            token = None  # Tokens are strings; anything else (even unhashable) is just unknown
+        with self.sessions_lock:
+            self.prune_sessions()
+            previous = self.sessions.get(token) if token else None
+            current = self.connection_sessions.get(client_socket)
+            displaced = []
+            if previous is not None and previous is not current:
+                # Another live connection may still own the session (half-open socket after a roam).
+                # It is closed below; until its handler exits it gets a fresh session, never the
+                # shared default one, which has no admission limits
+                displaced = [sock for sock, owned in self.connection_sessions.items() if owned is previous]
+                for sock in displaced:
+                    replacement = self.new_session()
+                    self.sessions[replacement.token] = replacement
+                    self.connection_sessions[sock] = replacement
+                if current is not None:
+                    # No connection maps to it any more and it was never detached, so pruning would miss it
+                    self.sessions.pop(current.token, None)
+                previous.detached_at = None
+                previous.resumed = True
+                previous.connected_at = current.connected_at if current is not None else time.time()
+                previous.first_scroll_logged = False
+                previous.clock_offset = None  # The bridge may be sending from a different clock now
+                self.connection_sessions[client_socket] = previous
+                session, status = previous, "resumed"
+            else:
+                session, status = current or self.default_session, "new"
         
+        for sock in displaced:
+            try:
+                # Wakes its handler's recv(), which detaches and closes the socket
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if displaced:
+            self.log(f"🔌 Closed {len(displaced)} connection(s) whose session {client_address} resumed")
+        self.note_capabilities(message, session)
+        if token and status == "new" and self.reuse_port:
+            # SO_REUSEPORT picks a worker per connection, so the issuing worker is usually another one
+            self.log(f"🔁 Resume from {client_address}: new (token unknown to this worker; "
+                     f"sessions do not move between workers)")
+        else:
+            self.log(f"🔁 Resume from {client_address}: {status}")
+        # Minimal reply: s=status, k=token to use next time, q=last applied sequence number
+        response = {"s": status, "k": session.token, "q": session.last_seq}
+        try:
+            client_socket.send((json.dumps(response, separators=(',', ':')) + '\n').encode('utf-8'))
+        except Exception as e:
+            self.log(f"❌ Failed to send resume reply to {client_address}: {e}")
+    
     def handle_scroll(self, message, client_socket, client_address):
         pixels = message.get('pixels', 0)
         direction = message.get('direction', 'vertical')
@@ -420,6 +882,21 @@ class WatchScrollerServer:
         # Actually perform the scroll on Mac
         self.perform_mac_scroll(pixels, direction)
         
+    def handle_profile(self, message, client_socket, client_address):
+        """Admin action: {"action":"profile","seconds":10,"mode":"sample"|"cprofile","memory":true}, loopback or Unix socket only"""
+        # Unix socket peers already passed the socket file's permission check
+        host = client_address[0] if isinstance(client_address, tuple) else 'unix'
+        if host not in ('127.0.0.1', '::1', 'unix'):
+            self.log(f"🚫 Profile request refused from non-local client {client_address}")
+            return
+        try:
+            started = self.start_profiling(float(message.get('seconds', 10.0)), message.get('mode', 'sample'),
+                                           bool(message.get('memory', True)))
+        except (TypeError, ValueError) as e:  # e.g. "seconds": null, 1e309 or an unknown mode
+            self.log(f"⚠️  {e}")
+            started = False
+        self.send_response({"action": "profile", "started": started}, client_socket, client_address)
+        
     def handle_set_active(self, message, client_socket, client_address):
         active = message.get('active', False)
         self.log(f"⚡ Set active: {active} from {client_address}")
@@ -428,8 +905,48 @@ class WatchScrollerServer:
         sensitivity = message.get('sensitivity', 1.0)
         self.log(f"🎚️  Set sensitivity: {sensitivity} from {client_address}")
         
+    def get_stats(self):
+        """Server-wide counters plus per-session state, for the stats action and tooling"""
+        with self.sessions_lock:
+            sessions = list(self.sessions.values())
+        return {
+            "clients": len(self.clients),
+            "sessions": len(sessions),
+            "admission": {
+                "max_clients": self.max_clients,
+                "rejected_connections": self.rejected_connections,
+                "shed_frames": self.shed_frames,
+                "shed_pixels": round(self.shed_pixels),
+            },
+            "control_latency": self.control_latency.summary(),
+            "injector": {
+                "mode": self.injector.mode,
+                "queue_depth": self.injector.queue_depth(),
+                "dropped": self.injector.dropped,
+                "latency": self.injector.latency_histogram().summary(),
+            },
+            "session_stats": [{
+                "token": session.token[:6],
+                "attached": session.detached_at is None,
+                "last_seq": session.last_seq,
+                "stale_dropped": session.stale_dropped,
+                "shed_frames": session.shed_frames,
+                "shed_pixels": round(session.shed_pixels),
+                "rtt_ms": round(session.rtt_ms, 1) if session.rtt_ms is not None else None,
+                "flow_control": session.flow_control,
+                "advertised_interval_ms": session.advertised[0] if session.advertised else None,
+                "advertised_batch": session.advertised[1] if session.advertised else None,
+            } for session in sessions],
+        }
+    
+    def handle_stats(self, message, client_socket, client_address):
+        response = {"action": "stats", "timestamp": time.time()}
+        response.update(self.get_stats())
+        self.send_response(response, client_socket, client_address)
+        
     def handle_request_status(self, message, client_socket, client_address):
         self.log(f"📊 Status request from {client_address}")
+        self.note_capabilities(message, self.get_session(client_socket))
         response = {
             "action": "statusResponse",
             "isConnected": True,
@@ -437,175 +954,277 @@ class WatchScrollerServer:
             "isEnabled": True,
             "sensitivity": 1.0,
             "timestamp": time.time(),
-            "server_info": f"Python test server on {self.host}:{self.port}"
+            "server_info": f"Python test server on {self.host}:{self.port}",
+            "resumeToken": self.get_session(client_socket).token,
+            "resumeGracePeriod": self.session_grace_period
         }
         self.send_response(response, client_socket, client_address)
+        self.record_control_latency(self.get_session(client_socket))
         
-    def send_response(self, response, client_socket, client_address):
+    def send_response(self, response, client_socket, client_address, quiet=False):
         try:
             response_json = json.dumps(response)
             response_bytes = response_json.encode('utf-8')
             client_socket.send(response_bytes)
-            self.log(f"📤 Sent response to {client_address}: {response_json}")
+            if not quiet:
+                self.log(f"📤 Sent response to {client_address}: {response_json}")
         except Exception as e:
             self.log(f"❌ Failed to send response to {client_address}: {e}")
     
-    def perform_mac_scroll(self, pixels, direction):
-        """Ultra-smooth trackpad-like scrolling with momentum and direction filtering"""
+    def perform_mac_scroll(self, pixels, direction, session=None, event_time=None, inject=True):
+        """Scroll one axis; returns its intended displacement in physics pixels, or None when filtered
+        
+        Same as perform_scroll_vector with the other axis at 0, without the second axis' bookkeeping.
+        """
+        if session is None:
+            session = self.default_session
+        current_time = event_time if event_time is not None else time.monotonic()
+        axis = session.vertical if direction == "vertical" else session.horizontal
         try:
-            # Filter out extreme values (likely errors or noise)
-            if abs(pixels) > 10000:
-                return
-            
-            current_time = time.time()
-            time_delta = current_time - self.last_scroll_time
-            
-            # Detect direction
-            current_direction = 1 if pixels > 0 else -1
+            final_scroll = self.scroll_axis(pixels, axis, current_time)
+            if final_scroll is None:
+                return None
             
-            # Filter out sudden direction changes (noise) - less aggressive for user's data
-            # If direction suddenly changes and value is small, it's likely noise
-            if self.last_direction != 0 and current_direction != self.last_direction:
-                if abs(pixels) < 50:  # Reduced threshold - only filter very small noise
-                    print(f"Filtered noise: {pixels}")
-                    return
+            units = int(axis.scroll_accumulator)
+            axis.scroll_accumulator -= units
+            if inject and units:
+                if direction == "vertical":
+                    self.injector.submit(units, 0, session.received_ns)
                 else:
-                    # Legitimate direction change - reset momentum
-                    self.momentum = 0
-                    self.scroll_history.clear()
-            
-            # Add to scroll history for smoothing
-            self.scroll_history.append(pixels)
-            if len(self.scroll_history) > self.max_history:
-                self.scroll_history.pop(0)
-            
-            # Calculate smoothed value using weighted average
-            if len(self.scroll_history) > 1:
-                # Recent values have more weight
-                weights = [0.1, 0.15, 0.2, 0.25, 0.3][-len(self.scroll_history):]
-                smoothed_pixels = sum(v * w for v, w in zip(self.scroll_history, weights)) / sum(weights)
-            else:
-                smoothed_pixels = pixels
-            
-            # Apply acceleration curve based on user behavior analysis
-            sign = 1 if smoothed_pixels > 0 else -1
-            abs_pixels = abs(smoothed_pixels)
-            
-            # Optimized for user's scroll patterns with controlled slow scroll acceleration
-            if abs_pixels < 900:  # Small movements - controlled response
-                processed_pixels = 120
-            elif abs_pixels < 2000:  # Medium speed - gentle acceleration
-                processed_pixels = (abs_pixels / 100) * 25
-            else:
-                processed_pixels = math.sqrt(abs_pixels/100*100 + 500) * 10
-            
-            processed_pixels = sign * processed_pixels
+                    self.injector.submit(0, units, session.received_ns)
             
-            # Update momentum with speed-aware control to prevent rocket effect on slow scrolls
-            if time_delta < 0.08:  # Fast scrolling - build momentum (increased threshold)
-                # Drastically reduce momentum for slow scrolls to prevent rocket effect
-                if abs_pixels < 900:  # Slow scrolls - minimal momentum
-                    momentum_factor = 0.05  # Very low momentum for slow scrolls
-                elif abs_pixels < 2000:  # Medium-slow - reduced momentum
-                    momentum_factor = 0.08
-                else:  # Fast speeds - normal momentum
-                    momentum_factor = 0.20
-                self.momentum = self.momentum * 0.6 + processed_pixels * momentum_factor
-            else:
-                # Faster momentum decay when scrolling stops, especially for slow scrolls
-                decay_rate = 0.75 if abs_pixels < 100 else self.momentum_decay
-                self.momentum *= decay_rate
-                # Clear momentum if it's very small to prevent drift
-                if abs(self.momentum) < 5:
-                    self.momentum = 0
-            
-            # Significantly reduce momentum influence for slow scrolls
-            if abs_pixels < 900:  # Slow scrolls - almost no momentum influence
-                momentum_influence = 0.02
-            elif abs_pixels < 2000:  # Medium-slow - minimal momentum
-                momentum_influence = 0.05
-            else:  # Fast speeds - normal momentum
-                momentum_influence = 0.20
-            final_scroll = processed_pixels + self.momentum * momentum_influence
-            
-            
-            # # Perform the scroll immediately (no accumulator for smoother response)
-            # # Speed-aware sensitivity to control slow scroll ending speed
-            # if abs_pixels < 900:  # Slow scrolls - lower sensitivity to prevent rocket effect
-            #     scroll_amount = int(final_scroll / 120)  # Reduced sensitivity for slow scrolls
-            # elif abs_pixels < 2000:  # Medium-slow scrolls
-            #     scroll_amount = int(final_scroll / 100)  # Moderate sensitivity
-            # else:  # Medium to fast scrolls - normal sensitivity
-            #     scroll_amount = int(final_scroll / 80)   # Normal sensitivity
-            
-            # PyAutoGUI uses inverted scrolling
-            scroll_direction = -int(final_scroll/120)
-            # Log result pixels for movement tracking
-            # print(f"result: {scroll_direction:.1f}")
+            session.last_scroll_time = current_time
+            return final_scroll
+                
+        except Exception as e:
+            self.log(f"❌ Failed to perform Mac scroll: {e}")
+            return None
+    
+    def perform_scroll_vector(self, vertical, horizontal, session=None, event_time=None, inject=True):
+        """Ultra-smooth trackpad-like scrolling on both axes, injected as one call
+        
+        Each non-zero axis runs through its own momentum/smoothing state, then
+        whatever whole output units both axes produced go to the injector
+        together, so a diagonal pan is one OS event where the backend allows it.
+        event_time is when the delta was produced (server monotonic clock); it
+        defaults to now for frames that carry no sender timestamp. Returns the intended
+        displacement per axis in physics pixels, None for a filtered or zero axis.
+        """
+        if session is None:
+            session = self.default_session
+        current_time = event_time if event_time is not None else time.monotonic()
+        try:
+            final_vertical = self.scroll_axis(vertical, session.vertical, current_time) if vertical else None
+            final_horizontal = self.scroll_axis(horizontal, session.horizontal, current_time) if horizontal else None
+            if final_vertical is None and final_horizontal is None:
+                return None, None
             
-            if PYAUTOGUI_AVAILABLE and abs(scroll_direction) > 0.01:  # Minimum threshold
-                if direction == "vertical":
-                    pyautogui.scroll(scroll_direction)
-                else:
-                    pyautogui.hscroll(scroll_direction)
-            elif not PYAUTOGUI_AVAILABLE and abs(scroll_direction) > 0.01:
-                # Use AppleScript as fallback
-                if direction == "vertical":
-                    # AppleScript scroll - negative Y = scroll up
-                    script = f'''
-                        tell application "System Events"
-                            tell process "Safari" to set frontmost to true
-                            key code 125 using {{}}
-                        end tell
-                        ''' if scroll_direction < 0 else f'''
-                        tell application "System Events"
-                            tell process "Safari" to set frontmost to true  
-                            key code 126 using {{}}
-                        end tell
-                        '''
-                else:
-                    script = f'''
-                        tell application "System Events"
-                            tell process "Safari" to set frontmost to true
-                            key code 124 using {{}}
-                        end tell
-                        ''' if scroll_direction > 0 else f'''
-                        tell application "System Events"
-                            tell process "Safari" to set frontmost to true
-                            key code 123 using {{}}
-                        end tell
-                        '''
-                    
-                subprocess.run(['osascript', '-e', script], capture_output=True)
+            # Whole backend units owed per moved axis; the fraction carries to the next delta
+            units_vertical = units_horizontal = 0
+            if final_vertical is not None:
+                axis = session.vertical
+                units_vertical = int(axis.scroll_accumulator)
+                axis.scroll_accumulator -= units_vertical
+            if final_horizontal is not None:
+                axis = session.horizontal
+                units_horizontal = int(axis.scroll_accumulator)
+                axis.scroll_accumulator -= units_horizontal
+            if inject and (units_vertical or units_horizontal):
+                self.injector.submit(units_vertical, units_horizontal, session.received_ns)
             
-            # Update state for all cases
-            self.last_direction = current_direction
-            self.last_scroll_time = current_time
+            session.last_scroll_time = current_time
+            return final_vertical, final_horizontal
                 
         except Exception as e:
             self.log(f"❌ Failed to perform Mac scroll: {e}")
+            return None, None
+    
+    def scroll_axis(self, pixels, axis, current_time):
+        """Momentum, smoothing and acceleration for one axis; adds the result to its accumulator
+        
+        Returns the displacement in physics pixels, or None when the delta is filtered.
+        """
+        # Filter out extreme values (likely errors or noise)
+        if abs(pixels) > 10000:
+            return
+        
+        time_delta = current_time - axis.last_scroll_time
+        
+        # Detect direction
+        current_direction = 1 if pixels > 0 else -1
+        
+        # Filter out sudden direction changes (noise) - less aggressive for user's data
+        # If direction suddenly changes and value is small, it's likely noise
+        if axis.last_direction != 0 and current_direction != axis.last_direction:
+            if abs(pixels) < 50:  # Reduced threshold - only filter very small noise
+                print(f"Filtered noise: {pixels}")
+                return
+            else:
+                # Legitimate direction change - reset momentum
+                axis.momentum = 0
+                axis.scroll_history.clear()
+        
+        # Add to scroll history for smoothing
+        axis.scroll_history.append(pixels)
+        if len(axis.scroll_history) > self.max_history:
+            axis.scroll_history.pop(0)
+        
+        # Calculate smoothed value using weighted average
+        if len(axis.scroll_history) > 1:
+            # Recent values have more weight
+            weights = [0.1, 0.15, 0.2, 0.25, 0.3][-len(axis.scroll_history):]
+            smoothed_pixels = sum(v * w for v, w in zip(axis.scroll_history, weights)) / sum(weights)
+        else:
+            smoothed_pixels = pixels
+        
+        # Apply acceleration curve based on user behavior analysis
+        sign = 1 if smoothed_pixels > 0 else -1
+        abs_pixels = abs(smoothed_pixels)
+        
+        # Optimized for user's scroll patterns with controlled slow scroll acceleration
+        if abs_pixels < 900:  # Small movements - controlled response
+            processed_pixels = 120
+        elif abs_pixels < 2000:  # Medium speed - gentle acceleration
+            processed_pixels = (abs_pixels / 100) * 25
+        else:
+            processed_pixels = math.sqrt(abs_pixels/100*100 + 500) * 10
+        
+        processed_pixels = sign * processed_pixels
+        
+        # Update momentum with speed-aware control to prevent rocket effect on slow scrolls
+        if time_delta < 0.08:  # Fast scrolling - build momentum (increased threshold)
+            # Drastically reduce momentum for slow scrolls to prevent rocket effect
+            if abs_pixels < 900:  # Slow scrolls - minimal momentum
+                momentum_factor = 0.05  # Very low momentum for slow scrolls
+            elif abs_pixels < 2000:  # Medium-slow - reduced momentum
+                momentum_factor = 0.08
+            else:  # Fast speeds - normal momentum
+                momentum_factor = 0.20
+            axis.momentum = axis.momentum * 0.6 + processed_pixels * momentum_factor
+        else:
+            # Faster momentum decay when scrolling stops, especially for slow scrolls
+            decay_rate = 0.75 if abs_pixels < 100 else self.momentum_decay
+            axis.momentum *= decay_rate
+            # Clear momentum if it's very small to prevent drift
+            if abs(axis.momentum) < 5:
+                axis.momentum = 0
+        
+        # Significantly reduce momentum influence for slow scrolls
+        if abs_pixels < 900:  # Slow scrolls - almost no momentum influence
+            momentum_influence = 0.02
+        elif abs_pixels < 2000:  # Medium-slow - minimal momentum
+            momentum_influence = 0.05
+        else:  # Fast speeds - normal momentum
+            momentum_influence = 0.20
+        final_scroll = processed_pixels + axis.momentum * momentum_influence
+        
+        
+        # # Perform the scroll immediately (no accumulator for smoother response)
+        # # Speed-aware sensitivity to control slow scroll ending speed
+        # if abs_pixels < 900:  # Slow scrolls - lower sensitivity to prevent rocket effect
+        #     scroll_amount = int(final_scroll / 120)  # Reduced sensitivity for slow scrolls
+        # elif abs_pixels < 2000:  # Medium-slow scrolls
+        #     scroll_amount = int(final_scroll / 100)  # Moderate sensitivity
+        # else:  # Medium to fast scrolls - normal sensitivity
+        #     scroll_amount = int(final_scroll / 80)   # Normal sensitivity
+        
+        # PyAutoGUI uses inverted scrolling. Convert to backend units (wheel lines, or
+        # pixels for pixel-precise backends); the caller injects the whole units
+        axis.scroll_accumulator -= final_scroll / self.scroll_unit * self.injector.resolution
+        
+        # Update state for all cases
+        axis.last_direction = current_direction
+        axis.last_scroll_time = current_time
+        return final_scroll
             
     def stop(self):
         self.log("🛑 Stopping server...")
         self.running = False
         
         # Unregister Bonjour service
-        self.unregister_bonjour_service()
+        if self.advertiser is not None:
+            self.advertiser.unregister_bonjour_service()
+        self.injector.stop()
         
         if self.server_socket:
+            try:
+                # close() alone does not wake a thread blocked in accept() on Linux
+                self.server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             self.server_socket.close()
-        for client in self.clients:
+        if self.unix_server_socket:
+            try:
+                self.unix_server_socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.unix_server_socket.close()
+            try:
+                os.unlink(self.unix_socket)
+            except OSError:
+                pass
+        with self.clients_lock:
+            clients = list(self.clients)
+        for client in clients:
             try:
-                client.close()
-            except:
+                # Wake the client thread's recv(); it removes and closes the socket itself
+                client.shutdown(socket.SHUT_RDWR)
+            except OSError:
                 pass
         self.log("✅ Server stopped")
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="WatchScroller TCP server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--backend', choices=sorted(SCROLL_BACKENDS), default=None,
+                        help='scroll output backend (default: pyautogui if installed, else applescript)')
+    parser.add_argument('--injector', choices=['inline', 'process'], default='inline',
+                        help='inject on client threads or in a dedicated child process')
+    parser.add_argument('--no-advertise', action='store_true',
+                        help='skip Bonjour and Supabase registration')
+    parser.add_argument('--backlog', type=int, default=128, help='listen() backlog')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes with SO_REUSEPORT listeners (implies a shared injector process)')
+    parser.add_argument('--unix-socket', metavar='PATH',
+                        help='also listen on a Unix domain socket for same-host clients')
+    parser.add_argument('--unix-socket-mode', type=lambda value: int(value, 8), default=0o600,
+                        help='permissions of the Unix socket file, octal (default 600: owner only)')
+    parser.add_argument('--max-clients', type=int, default=64,
+                        help='connections accepted at once; 0 for no limit')
+    parser.add_argument('--max-frame-rate', type=float, default=240.0,
+                        help='frames/sec per connection before input is shed; 0 for no limit')
+    parser.add_argument('--max-displacement-rate', type=float, default=600000.0,
+                        help='scroll pixels/sec per connection (both axes) before deltas are shed; 0 for no limit')
+    parser.add_argument('--no-control-lane', action='store_true',
+                        help='answer ping/status in arrival order instead of ahead of queued scroll frames')
+    parser.add_argument('--max-control-rate', type=float, default=20.0,
+                        help='ping/status per second per connection on the priority lane; 0 for no limit')
+    args = parser.parse_args()
+    if args.unix_socket and args.workers > 1:
+        parser.error('--unix-socket is only supported with a single worker')
+    
+    server_options = {"max_clients": args.max_clients or None, "frame_rate_limit": args.max_frame_rate or None,
+                      "displacement_rate_limit": args.max_displacement_rate or None,
+                      "control_lane": not args.no_control_lane,
+                      "control_rate_limit": args.max_control_rate or None}
+    
     print("🧪 WatchScroller Python Test Server")
     print("===================================")
     
-    server = WatchScrollerServer()
+    if args.workers > 1:
+        from workers import WorkerSupervisor
+        WorkerSupervisor(host=args.host, port=args.port, workers=args.workers, backlog=args.backlog,
+                         backend_name=args.backend, advertise=not args.no_advertise,
+                         server_options=server_options).run()
+        sys.exit(0)
+    
+    server = WatchScrollerServer(host=args.host, port=args.port, backend=create_backend(args.backend),
+                                 injector=args.injector, advertise=not args.no_advertise,
+                                 backlog=args.backlog, unix_socket=args.unix_socket,
+                                 unix_socket_mode=args.unix_socket_mode, **server_options)
     
     try:
         server.start()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Multi-worker listener mode.
+
+The supervisor forks N worker processes, each binding its own SO_REUSEPORT
+listener on the same port and running a full WatchScrollerServer accept loop,
+so decoding and handling spread across cores. Workers never touch the OS
+event queue themselves: each pushes scroll output into its own shared-memory
+ring, and a single injector process drains all rings. The supervisor owns
+Bonjour/Supabase registration and restarts workers (and the injector) that die.
+"""
+import multiprocessing
+import multiprocessing.connection
+import os
+import signal
+import time
+from datetime import datetime
+
+from injector_process import InjectorSupervisor, RingInjector, ShmRing
+
+
+def worker_main(index, host, port, backlog, backend_name, ring_name, wake_writer, server_options):
+    from scroll_backends import create_backend
+    from tcp_server import WatchScrollerServer
+    backend = create_backend(backend_name)
+    injector = RingInjector(ShmRing(name=ring_name), wake_writer, backend.resolution)
+    server = WatchScrollerServer(host=host, port=port, backend=backend,
+                                 injector=injector, advertise=False, backlog=backlog,
+                                 reuse_port=True, log_prefix=f"[w{index}] ", **server_options)
+    try:
+        server.start()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+class WorkerSupervisor:
+    def __init__(self, host='0.0.0.0', port=8888, workers=None, backlog=128, backend_name=None,
+                 advertise=True, restart_delay=1.0, server_options=None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.backlog = backlog
+        self.backend_name = backend_name
+        self.advertise = advertise
+        self.restart_delay = restart_delay
+        self.server_options = server_options or {}  # Extra WatchScrollerServer kwargs, e.g. admission limits
+        self.processes = {}
+        self.rings = []
+        self.restarts = 0
+        self.running = False
+        self.injector = None
+        self.advertiser = None
+
+    def log(self, message):
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        print(f"{timestamp} [supervisor] {message}", flush=True)
+
+    def _spawn(self, index):
+        process = multiprocessing.Process(
+            target=worker_main, name=f"scroll-worker-{index}",
+            args=(index, self.host, self.port, self.backlog, self.backend_name,
+                  self.rings[index].name, self.wake_writer, self.server_options))
+        process.start()
+        self.processes[index] = process
+        self.log(f"👷 Worker {index} started (pid {process.pid})")
+
+    def run(self):
+        from scroll_backends import create_backend
+        self.backend_name = create_backend(self.backend_name).name
+
+        self.rings = [ShmRing() for _ in range(self.workers)]
+        wake_reader, self.wake_writer = multiprocessing.Pipe(duplex=False)
+        self.injector = InjectorSupervisor([ring.name for ring in self.rings], wake_reader,
+                                           self.backend_name, self.log)
+        self.running = True
+        # terminate() from a service manager or benchmark should still reap the pool
+        signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+        for index in range(self.workers):
+            self._spawn(index)
+
+        # Discovery is registered once for the whole pool
+        if self.advertise:
+            from discovery import ServiceAdvertiser
+            self.advertiser = ServiceAdvertiser(self.port, self.log)
+            self.advertiser.register_bonjour_service()
+            self.advertiser.register_ip_with_supabase()
+        self.log(f"🎉 {self.workers} workers listening on {self.host}:{self.port} (backlog {self.backlog})")
+        if self.workers > 1:
+            self.log("⚠️  Session resume is per worker: a reconnecting bridge lands on a random worker "
+                     "and usually gets a fresh session")
+
+        try:
+            while self.running:
+                sentinels = {process.sentinel: index for index, process in self.processes.items()}
+                for sentinel in multiprocessing.connection.wait(list(sentinels)):
+                    index = sentinels[sentinel]
+                    self.processes[index].join()
+                    exitcode = self.processes[index].exitcode
+                    if not self.running:
+                        break
+                    self.restarts += 1
+                    self.log(f"💥 Worker {index} exited with code {exitcode}, restarting")
+                    time.sleep(self.restart_delay)
+                    self._spawn(index)
+        except KeyboardInterrupt:
+            self.log("🔄 Received interrupt signal")
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.running = False
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes.values():
+            process.join(timeout=2)
+        if self.injector is not None:
+            self.injector.stop()
+        if self.advertiser is not None:
+            self.advertiser.unregister_bonjour_service()
+        for ring in self.rings:
+            ring.close()
+        self.log("✅ Workers stopped")